@@ -0,0 +1,94 @@
+"""Initial schema, as previously created by Base.metadata.create_all
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('hashed_password', sa.String(), nullable=False),
+        sa.Column('full_name', sa.String()),
+        sa.Column('role', sa.Enum('ADMIN', 'ACCOUNTANT', 'VIEWER', name='userrole')),
+        sa.Column('is_active', sa.Boolean()),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True)),
+    )
+    op.create_index('ix_users_id', 'users', ['id'])
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'companies',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('code', sa.String()),
+        sa.Column('fiscal_year_start', sa.Date(), nullable=False),
+        sa.Column('currency', sa.String(3)),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True)),
+    )
+    op.create_index('ix_companies_id', 'companies', ['id'])
+    op.create_index('ix_companies_code', 'companies', ['code'], unique=True)
+
+    op.create_table(
+        'accounts',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('company_id', sa.Integer(), sa.ForeignKey('companies.id'), nullable=False),
+        sa.Column('code', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('type', sa.Enum('ASSET', 'LIABILITY', 'EQUITY', 'REVENUE', 'EXPENSE', name='accounttype'), nullable=False),
+        sa.Column('parent_id', sa.Integer(), sa.ForeignKey('accounts.id')),
+        sa.Column('is_active', sa.Boolean()),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True)),
+    )
+    op.create_index('ix_accounts_id', 'accounts', ['id'])
+
+    op.create_table(
+        'journal_entries',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('company_id', sa.Integer(), sa.ForeignKey('companies.id'), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('description', sa.String(), nullable=False),
+        sa.Column('reference', sa.String()),
+        sa.Column('created_by', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True)),
+    )
+    op.create_index('ix_journal_entries_id', 'journal_entries', ['id'])
+    op.create_index('ix_journal_entries_date', 'journal_entries', ['date'])
+
+    op.create_table(
+        'journal_lines',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('entry_id', sa.Integer(), sa.ForeignKey('journal_entries.id'), nullable=False),
+        sa.Column('account_id', sa.Integer(), sa.ForeignKey('accounts.id'), nullable=False),
+        sa.Column('debit', sa.Numeric(15, 2)),
+        sa.Column('credit', sa.Numeric(15, 2)),
+        sa.Column('description', sa.String()),
+        sa.CheckConstraint('(debit = 0 AND credit > 0) OR (debit > 0 AND credit = 0)', name='debit_credit_check'),
+    )
+    op.create_index('ix_journal_lines_id', 'journal_lines', ['id'])
+
+
+def downgrade():
+    op.drop_table('journal_lines')
+    op.drop_table('journal_entries')
+    op.drop_table('accounts')
+    op.drop_table('companies')
+    op.drop_table('users')
+    sa.Enum(name='accounttype').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='userrole').drop(op.get_bind(), checkfirst=True)
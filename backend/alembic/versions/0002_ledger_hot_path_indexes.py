@@ -0,0 +1,37 @@
+"""Ledger hot-path indexes
+
+Databases created with create_all may already have some of these objects,
+so everything here is created only if missing.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_accounts_company_code', 'accounts', ['company_id', 'code'], {}),
+    ('ix_journal_entries_company_date_id', 'journal_entries', ['company_id', 'date', 'id'], {}),
+    ('ix_journal_entries_company_reference', 'journal_entries', ['company_id', 'reference'], {}),
+    ('ix_journal_lines_entry_id', 'journal_lines', ['entry_id'], {}),
+    ('ix_journal_lines_account_entry', 'journal_lines', ['account_id', 'entry_id'],
+     {'postgresql_include': ['debit', 'credit']}),
+]
+
+
+def upgrade():
+    for name, table, columns, kwargs in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True, **kwargs)
+
+
+def downgrade():
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
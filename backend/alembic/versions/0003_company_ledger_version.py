@@ -0,0 +1,25 @@
+"""Per-company ledger version for report caching
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('companies') as batch_op:
+        batch_op.add_column(sa.Column('ledger_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('companies') as batch_op:
+        batch_op.drop_column('ledger_version')
@@ -0,0 +1,48 @@
+"""Signed integer minor-unit amount on journal lines
+
+Adds journal_lines.amount_minor (debit positive, credit negative, in cents)
+and backfills it from debit/credit. On PostgreSQL the covering account index
+is rebuilt to include it.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+BACKFILL = """
+UPDATE journal_lines
+SET amount_minor = CAST(ROUND((COALESCE(debit, 0) - COALESCE(credit, 0)) * 100) AS BIGINT)
+WHERE amount_minor IS NULL
+"""
+
+
+def _rebuild_account_index(include):
+    op.drop_index('ix_journal_lines_account_entry', table_name='journal_lines')
+    op.create_index('ix_journal_lines_account_entry', 'journal_lines', ['account_id', 'entry_id'],
+                    postgresql_include=include)
+
+
+def upgrade():
+    with op.batch_alter_table('journal_lines') as batch_op:
+        batch_op.add_column(sa.Column('amount_minor', sa.BigInteger(), nullable=True))
+    op.execute(BACKFILL)
+
+    if op.get_bind().dialect.name == 'postgresql':
+        _rebuild_account_index(['debit', 'credit', 'amount_minor'])
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        _rebuild_account_index(['debit', 'credit'])
+
+    with op.batch_alter_table('journal_lines') as batch_op:
+        batch_op.drop_column('amount_minor')
@@ -0,0 +1,62 @@
+"""Fiscal year close: closing entries, carried-forward opening balances, period lock
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('companies') as batch_op:
+        batch_op.add_column(sa.Column('closed_through', sa.Date(), nullable=True))
+    with op.batch_alter_table('journal_entries') as batch_op:
+        batch_op.add_column(sa.Column('is_closing', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+    op.create_table(
+        'account_opening_balances',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('company_id', sa.Integer(), sa.ForeignKey('companies.id'), nullable=False),
+        sa.Column('account_id', sa.Integer(), sa.ForeignKey('accounts.id'), nullable=False),
+        sa.Column('period_start', sa.Date(), nullable=False),
+        sa.Column('debit', sa.Numeric(15, 2), nullable=False),
+        sa.Column('credit', sa.Numeric(15, 2), nullable=False),
+        sa.UniqueConstraint('account_id', 'period_start', name='uq_account_opening_balance'),
+    )
+    op.create_index('ix_account_opening_balances_id', 'account_opening_balances', ['id'])
+    op.create_index('ix_account_opening_balances_company_start', 'account_opening_balances',
+                    ['company_id', 'period_start'])
+
+    op.create_table(
+        'fiscal_year_closes',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('company_id', sa.Integer(), sa.ForeignKey('companies.id'), nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('end_date', sa.Date(), nullable=False),
+        sa.Column('retained_earnings_account_id', sa.Integer(), sa.ForeignKey('accounts.id'), nullable=False),
+        sa.Column('closing_entry_id', sa.Integer(), sa.ForeignKey('journal_entries.id'), nullable=True),
+        sa.Column('closed_by', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('closed_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint('company_id', 'end_date', name='uq_fiscal_year_close'),
+    )
+    op.create_index('ix_fiscal_year_closes_id', 'fiscal_year_closes', ['id'])
+
+
+def downgrade():
+    op.drop_index('ix_fiscal_year_closes_id', table_name='fiscal_year_closes')
+    op.drop_table('fiscal_year_closes')
+    op.drop_index('ix_account_opening_balances_company_start', table_name='account_opening_balances')
+    op.drop_index('ix_account_opening_balances_id', table_name='account_opening_balances')
+    op.drop_table('account_opening_balances')
+    with op.batch_alter_table('journal_entries') as batch_op:
+        batch_op.drop_column('is_closing')
+    with op.batch_alter_table('companies') as batch_op:
+        batch_op.drop_column('closed_through')
@@ -0,0 +1,55 @@
+"""Company and entry date copied onto journal lines
+
+Adds journal_lines.company_id and journal_lines.entry_date, backfilled from
+journal_entries, so ledger aggregates filter lines without joining entries.
+A (company_id, entry_date, account_id) index serves those scans; on PostgreSQL
+it covers the amount columns.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+BACKFILL = """
+UPDATE journal_lines
+SET company_id = (SELECT company_id FROM journal_entries WHERE journal_entries.id = journal_lines.entry_id),
+    entry_date = (SELECT date FROM journal_entries WHERE journal_entries.id = journal_lines.entry_id)
+"""
+
+POSTGRESQL_BACKFILL = """
+UPDATE journal_lines
+SET company_id = journal_entries.company_id, entry_date = journal_entries.date
+FROM journal_entries
+WHERE journal_entries.id = journal_lines.entry_id
+"""
+
+
+def upgrade():
+    with op.batch_alter_table('journal_lines') as batch_op:
+        batch_op.add_column(sa.Column('company_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('entry_date', sa.Date(), nullable=True))
+    op.execute(POSTGRESQL_BACKFILL if op.get_bind().dialect.name == 'postgresql' else BACKFILL)
+
+    with op.batch_alter_table('journal_lines') as batch_op:
+        batch_op.alter_column('company_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column('entry_date', existing_type=sa.Date(), nullable=False)
+        batch_op.create_foreign_key('fk_journal_lines_company_id', 'companies', ['company_id'], ['id'])
+    op.create_index('ix_journal_lines_company_date', 'journal_lines', ['company_id', 'entry_date', 'account_id'],
+                    postgresql_include=['debit', 'credit', 'amount_minor'])
+
+
+def downgrade():
+    op.drop_index('ix_journal_lines_company_date', table_name='journal_lines')
+    with op.batch_alter_table('journal_lines') as batch_op:
+        batch_op.drop_constraint('fk_journal_lines_company_id', type_='foreignkey')
+        batch_op.drop_column('entry_date')
+        batch_op.drop_column('company_id')
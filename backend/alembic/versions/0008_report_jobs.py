@@ -0,0 +1,49 @@
+"""Background report jobs
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'report_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('company_id', sa.Integer(), sa.ForeignKey('companies.id'), nullable=False),
+        sa.Column('report', sa.String(64), nullable=False),
+        sa.Column('params', sa.JSON(), nullable=False),
+        sa.Column('priority', sa.Integer(), nullable=False),
+        sa.Column(
+            'status',
+            sa.Enum('QUEUED', 'RUNNING', 'SUCCEEDED', 'FAILED', 'CANCELLED', name='reportjobstatus'),
+            nullable=False
+        ),
+        sa.Column('error', sa.Text()),
+        sa.Column('result', sa.LargeBinary()),
+        sa.Column('content_type', sa.String(100)),
+        sa.Column('created_by', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('started_at', sa.DateTime()),
+        sa.Column('finished_at', sa.DateTime()),
+    )
+    op.create_index('ix_report_jobs_id', 'report_jobs', ['id'])
+    op.create_index('ix_report_jobs_status_priority', 'report_jobs', ['status', 'priority', 'id'])
+    op.create_index('ix_report_jobs_company_status', 'report_jobs', ['company_id', 'status'])
+
+
+def downgrade():
+    op.drop_index('ix_report_jobs_company_status', table_name='report_jobs')
+    op.drop_index('ix_report_jobs_status_priority', table_name='report_jobs')
+    op.drop_index('ix_report_jobs_id', table_name='report_jobs')
+    op.drop_table('report_jobs')
+    sa.Enum(name='reportjobstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,41 @@
+"""Period balance snapshot table, in its own revision rather than among the 0002 indexes
+
+Databases created with create_all, or migrated when 0002 still created this
+table, already have it, so it is created only if missing.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table('account_period_balances'):
+        op.create_table(
+            'account_period_balances',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('company_id', sa.Integer(), sa.ForeignKey('companies.id'), nullable=False),
+            sa.Column('account_id', sa.Integer(), sa.ForeignKey('accounts.id'), nullable=False),
+            sa.Column('period_date', sa.Date(), nullable=False),
+            sa.Column('debit', sa.Numeric(15, 2), nullable=False),
+            sa.Column('credit', sa.Numeric(15, 2), nullable=False),
+            sa.UniqueConstraint('account_id', 'period_date', name='uq_account_period_balance'),
+        )
+    op.create_index('ix_account_period_balances_id', 'account_period_balances', ['id'], if_not_exists=True)
+    op.create_index('ix_account_period_balances_company_date', 'account_period_balances',
+                    ['company_id', 'period_date'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_account_period_balances_company_date', table_name='account_period_balances')
+    op.drop_index('ix_account_period_balances_id', table_name='account_period_balances')
+    op.drop_table('account_period_balances')
@@ -0,0 +1,66 @@
+"""Monthly roll-up of the period balance snapshot
+
+Existing daily rows are summed into their months so snapshots already built
+keep answering reports without a rebuild.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    month_balances = op.create_table(
+        'account_month_balances',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('company_id', sa.Integer(), sa.ForeignKey('companies.id'), nullable=False),
+        sa.Column('account_id', sa.Integer(), sa.ForeignKey('accounts.id'), nullable=False),
+        sa.Column('month_start', sa.Date(), nullable=False),
+        sa.Column('debit', sa.Numeric(15, 2), nullable=False),
+        sa.Column('credit', sa.Numeric(15, 2), nullable=False),
+        sa.UniqueConstraint('account_id', 'month_start', name='uq_account_month_balance'),
+    )
+    op.create_index('ix_account_month_balances_id', 'account_month_balances', ['id'])
+    op.create_index('ix_account_month_balances_company_month', 'account_month_balances',
+                    ['company_id', 'month_start'])
+
+    # Date truncation differs per dialect, so months are summed here
+    period_balances = sa.table(
+        'account_period_balances',
+        sa.column('company_id', sa.Integer()),
+        sa.column('account_id', sa.Integer()),
+        sa.column('period_date', sa.Date()),
+        sa.column('debit', sa.Numeric(15, 2)),
+        sa.column('credit', sa.Numeric(15, 2)),
+    )
+    months = {}
+    for row in op.get_bind().execute(sa.select(period_balances)):
+        key = (row.company_id, row.account_id, row.period_date.replace(day=1))
+        debit, credit = months.get(key, (0, 0))
+        months[key] = (debit + row.debit, credit + row.credit)
+    if months:
+        op.bulk_insert(month_balances, [
+            {
+                'company_id': company_id,
+                'account_id': account_id,
+                'month_start': month_start,
+                'debit': debit,
+                'credit': credit,
+            }
+            for (company_id, account_id, month_start), (debit, credit) in months.items()
+        ])
+
+
+def downgrade():
+    op.drop_index('ix_account_month_balances_company_month', table_name='account_month_balances')
+    op.drop_index('ix_account_month_balances_id', table_name='account_month_balances')
+    op.drop_table('account_month_balances')
@@ -0,0 +1,25 @@
+"""Per-company accounts version for the account tree and account id caches
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('companies') as batch_op:
+        batch_op.add_column(sa.Column('accounts_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('companies') as batch_op:
+        batch_op.drop_column('accounts_version')
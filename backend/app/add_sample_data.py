@@ -6,6 +6,7 @@ from datetime import date, timedelta
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
 from app.models import JournalEntry, JournalLine, Account, User
+from app.core.cache import bump_ledger_version
 
 def add_sample_journal_entries(db: Session):
     """Add sample journal entries to the database"""
@@ -110,6 +111,9 @@ def add_sample_journal_entries(db: Session):
             db.add(JournalLine(entry_id=tech_entry.id, account_id=tech_cash.id, debit=35000.00, credit=0.00, description="Cash received"))
             db.add(JournalLine(entry_id=tech_entry.id, account_id=tech_revenue.id, debit=0.00, credit=35000.00, description="Service revenue"))
         
+        # Retire any cached reports for the companies that received entries
+        bump_ledger_version(db, 1)
+        bump_ledger_version(db, 2)
         db.commit()
         print("Sample journal entries added successfully!")
         
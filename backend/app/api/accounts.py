@@ -1,19 +1,21 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import Depends, HTTPException
 from sqlalchemy.orm import Session
 from ..database import get_db
-from ..models import Account, Company, User
+from ..models import Account, Company
 from ..models.user import UserRole
 from ..schemas import AccountCreate, Account as AccountSchema
-from ..core.auth import get_current_active_user
+from ..core.auth import get_current_active_user, Principal
+from ..core.routing import SessionRouter
+from ..core.cache import invalidate_company, bump_accounts_version
 
-router = APIRouter()
+router = SessionRouter()
 
 @router.post("/", response_model=AccountSchema)
 def create_account(
     account: AccountCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     if current_user.role not in [UserRole.ADMIN, UserRole.ACCOUNTANT]:
         raise HTTPException(status_code=403, detail="Not authorized")
@@ -42,7 +44,9 @@ def create_account(
     
     db_account = Account(**account.dict())
     db.add(db_account)
+    bump_accounts_version(db, account.company_id)
     db.commit()
+    invalidate_company(account.company_id)
     db.refresh(db_account)
     return db_account
 
@@ -52,7 +56,7 @@ def read_accounts(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     accounts = db.query(Account).filter(
         Account.company_id == company_id
@@ -63,7 +67,7 @@ def read_accounts(
 def read_account(
     account_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     account = db.query(Account).filter(Account.id == account_id).first()
     if account is None:
@@ -75,7 +79,7 @@ def update_account(
     account_id: int,
     account_update: AccountCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     if current_user.role not in [UserRole.ADMIN, UserRole.ACCOUNTANT]:
         raise HTTPException(status_code=403, detail="Not authorized")
@@ -84,9 +88,15 @@ def update_account(
     if not db_account:
         raise HTTPException(status_code=404, detail="Account not found")
     
+    previous_company_id = db_account.company_id
     for key, value in account_update.dict().items():
         setattr(db_account, key, value)
     
+    bump_accounts_version(db, previous_company_id)
+    if db_account.company_id != previous_company_id:
+        bump_accounts_version(db, db_account.company_id)
     db.commit()
+    invalidate_company(previous_company_id)
+    invalidate_company(db_account.company_id)
     db.refresh(db_account)
     return db_account
\ No newline at end of file
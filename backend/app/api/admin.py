@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, HTTPException
+from ..database import engine, async_engine
+from ..models.user import UserRole
+from ..core.auth import get_current_active_user, Principal
+from ..core.pool_metrics import pool_status
+
+router = APIRouter()
+
+def require_admin(current_user: Principal = Depends(get_current_active_user)) -> Principal:
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return current_user
+
+@router.get("/pool")
+def read_pool_status(current_user: Principal = Depends(require_admin)):
+    """Connection pool occupancy and checkout wait times"""
+    return {
+        "database": engine.dialect.name,
+        "sync": pool_status(engine.pool),
+        "async": pool_status(async_engine.sync_engine.pool) if async_engine is not None else None
+    }
@@ -6,7 +6,7 @@ from ..database import get_db
 from ..models import User
 from ..schemas import UserCreate, User as UserSchema, Token
 from ..core.security import verify_password, get_password_hash, create_access_token
-from ..core.auth import get_current_active_user
+from ..core.auth import get_current_active_user, Principal
 from ..config import settings
 
 router = APIRouter()
@@ -32,8 +32,9 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     db.refresh(db_user)
     return db_user
 
+# Plain def so FastAPI runs the user lookup and bcrypt check in its thread pool
 @router.post("/token", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == form_data.username).first()
     if not user or not verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
@@ -49,5 +50,8 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserSchema)
-async def read_users_me(current_user: User = Depends(get_current_active_user)):
-    return current_user
\ No newline at end of file
+def read_users_me(current_user: Principal = Depends(get_current_active_user), db: Session = Depends(get_db)):
+    user = db.query(User).filter(User.id == current_user.id).first()
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
\ No newline at end of file
@@ -1,11 +1,17 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from ..config import settings
 from ..database import get_db
-from ..models import Company, User
+from ..models import Company, FiscalYearClose
 from ..models.user import UserRole
 from ..schemas import CompanyCreate, Company as CompanySchema
-from ..core.auth import get_current_active_user
+from ..schemas import FiscalYearCloseCreate, FiscalYearClose as FiscalYearCloseSchema, StreamToken
+from ..core.auth import get_current_active_user, get_stream_user, create_stream_token, Principal
+from ..core.cache import invalidate_company
+from ..core.period_close import close_fiscal_year
+from ..core.ledger_events import stream_ledger_events
 
 router = APIRouter()
 
@@ -13,7 +19,7 @@ router = APIRouter()
 def create_company(
     company: CompanyCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Not authorized")
@@ -33,7 +39,7 @@ def read_companies(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     companies = db.query(Company).offset(skip).limit(limit).all()
     return companies
@@ -42,9 +48,82 @@ def read_companies(
 def read_company(
     company_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     company = db.query(Company).filter(Company.id == company_id).first()
     if company is None:
         raise HTTPException(status_code=404, detail="Company not found")
-    return company
\ No newline at end of file
+    return company
+
+@router.post("/{company_id}/close", response_model=FiscalYearCloseSchema)
+def close_company_fiscal_year(
+    company_id: int,
+    close: FiscalYearCloseCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """Close a fiscal year: post closing entries, carry balances forward and lock the period"""
+    if current_user.role not in [UserRole.ADMIN, UserRole.ACCOUNTANT]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    company = db.query(Company).filter(Company.id == company_id).with_for_update().first()
+    if company is None:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    try:
+        fiscal_year_close = close_fiscal_year(
+            db, company, close.fiscal_year_end, close.retained_earnings_account_id, current_user.id
+        )
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    db.commit()
+    invalidate_company(company_id)
+    db.refresh(fiscal_year_close)
+    return fiscal_year_close
+
+@router.get("/{company_id}/closes", response_model=List[FiscalYearCloseSchema])
+def read_fiscal_year_closes(
+    company_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    return db.query(FiscalYearClose).filter(
+        FiscalYearClose.company_id == company_id
+    ).order_by(FiscalYearClose.end_date).all()
+
+@router.post("/{company_id}/events/token", response_model=StreamToken)
+def create_company_events_token(
+    company_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """Short-lived token for opening GET /{company_id}/events as ?stream_token=; fetch a new one to reconnect"""
+    # Verify company exists
+    company = db.query(Company).filter(Company.id == company_id).first()
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    return {
+        "stream_token": create_stream_token(current_user.id, company.id),
+        "expires_in": settings.STREAM_TOKEN_EXPIRE_SECONDS
+    }
+
+@router.get("/{company_id}/events")
+def stream_company_events(
+    company_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_stream_user)
+):
+    """Server-sent events for the company's ledger: entry_posted with signed per-account deltas on each posting"""
+    # Verify company exists
+    company = db.query(Company).filter(Company.id == company_id).first()
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    return StreamingResponse(
+        stream_ledger_events(company.id, company.ledger_version or 0),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,82 +1,202 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import io
+from datetime import date
+from typing import List, Optional
+from fastapi import Depends, HTTPException, Header, UploadFile, File
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
 from ..database import get_db
-from ..models import JournalEntry, JournalLine, Account, Company, User
+from ..models import JournalEntry, JournalLine, Company
 from ..models.user import UserRole
 from ..schemas import JournalEntryCreate, JournalEntry as JournalEntrySchema
-from ..core.auth import get_current_active_user
+from ..core.auth import get_current_active_user, Principal
+from ..core.routing import SessionRouter, cpu_bound
+from ..core.journal_import import import_journal, DEFAULT_CHUNK_SIZE
+from ..core.cache import invalidate_company, account_id_cache
+from ..core.ledger_cache import ledger_cache
+from ..core.ledger_events import entry_posted_event, publish_ledger_event
+from ..core.amounts import line_minor
+from ..core.posting import begin_posting, post_journal_entry
+from ..core.idempotency import (
+    IDEMPOTENCY_KEY_HEADER, IDEMPOTENT_REPLAY_HEADER, MAX_KEY_LENGTH,
+    request_fingerprint, find_idempotent_entry_id, remember_idempotency_key
+)
+from ..core.pagination import encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
+from ..core.responses import LedgerJSONResponse
 
-router = APIRouter()
+router = SessionRouter()
 
-@router.post("/", response_model=JournalEntrySchema)
+@router.post("/", response_model=JournalEntrySchema, response_class=LedgerJSONResponse)
 def create_journal_entry(
     entry: JournalEntryCreate,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     if current_user.role not in [UserRole.ADMIN, UserRole.ACCOUNTANT]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    # Verify company exists
-    company = db.query(Company).filter(Company.id == entry.company_id).first()
+    # A retry with a known key gets the original entry back, without posting again
+    if idempotency_key is not None:
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            raise HTTPException(status_code=400, detail=f"{IDEMPOTENCY_KEY_HEADER} must be 1-{MAX_KEY_LENGTH} characters")
+        fingerprint = request_fingerprint(entry)
+        replay = replay_journal_entry(db, current_user.id, idempotency_key, fingerprint)
+        if replay is not None:
+            return replay
+    
+    # Verify company exists, bumping its ledger version for this posting
+    company = begin_posting(db, entry.company_id)
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
     
-    # Verify all accounts exist and belong to the same company
-    account_ids = [line.account_id for line in entry.lines]
-    accounts = db.query(Account).filter(
-        Account.id.in_(account_ids),
-        Account.company_id == entry.company_id
-    ).all()
+    # Closed fiscal years are locked
+    if company.closed_through is not None and entry.date <= company.closed_through:
+        raise HTTPException(status_code=400, detail=f"Period is closed through {company.closed_through.isoformat()}")
     
-    if len(accounts) != len(account_ids):
+    # Verify all accounts exist and belong to the same company; an account may appear on several lines
+    if account_id_cache.unknown(db, entry.company_id, company.accounts_version, (line.account_id for line in entry.lines)):
         raise HTTPException(status_code=404, detail="One or more accounts not found or don't belong to this company")
     
-    # Create journal entry
-    db_entry = JournalEntry(
-        company_id=entry.company_id,
-        date=entry.date,
-        description=entry.description,
-        reference=entry.reference,
-        created_by=current_user.id
-    )
-    db.add(db_entry)
-    db.flush()  # Get the entry ID
+    row = post_journal_entry(db, entry, current_user.id)
+    # Goes out with the commit below, and not at all if it rolls back
+    publish_ledger_event(db, entry_posted_event(row, company.ledger_version))
+    try:
+        if idempotency_key is not None:
+            remember_idempotency_key(db, current_user.id, idempotency_key, fingerprint, row["id"])
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        # A concurrent request with the same key posted first
+        replay = replay_journal_entry(db, current_user.id, idempotency_key, fingerprint) if idempotency_key else None
+        if replay is None:
+            raise
+        return replay
+    invalidate_company(entry.company_id)
+    ledger_cache.append(entry.company_id, company.ledger_version, entry.date, [
+        {"account_id": line["account_id"], "amount_minor": line_minor(line["debit"], line["credit"])}
+        for line in row["lines"]
+    ])
+    return LedgerJSONResponse(row)
+
+def replay_journal_entry(db: Session, user_id: int, key: str, fingerprint: str) -> Optional[LedgerJSONResponse]:
+    """The response for an entry already posted under an idempotency key, if there is one"""
+    try:
+        entry_id = find_idempotent_entry_id(db, user_id, key, fingerprint)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if entry_id is None:
+        return None
+    entry = db.query(JournalEntry).options(selectinload(JournalEntry.lines)).filter(JournalEntry.id == entry_id).one()
+    return LedgerJSONResponse(entry_row(entry), headers={IDEMPOTENT_REPLAY_HEADER: "true"})
+
+@router.post("/import")
+@cpu_bound
+def import_journal_entries(
+    company_id: int,
+    file: UploadFile = File(...),
+    file_format: str = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """Bulk import journal entries from an NDJSON or CSV upload"""
+    if current_user.role not in [UserRole.ADMIN, UserRole.ACCOUNTANT]:
+        raise HTTPException(status_code=403, detail="Not authorized")
     
-    # Create journal lines
-    for line in entry.lines:
-        db_line = JournalLine(
-            entry_id=db_entry.id,
-            account_id=line.account_id,
-            debit=line.debit,
-            credit=line.credit,
-            description=line.description
-        )
-        db.add(db_line)
+    company = db.query(Company).filter(Company.id == company_id).first()
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    if file_format is None:
+        file_format = "csv" if (file.filename or "").lower().endswith(".csv") else "ndjson"
+    if file_format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="file_format must be 'ndjson' or 'csv'")
     
-    db.commit()
-    db.refresh(db_entry)
-    return db_entry
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    try:
+        return import_journal(db, company_id, current_user.id, stream, file_format, chunk_size)
+    finally:
+        invalidate_company(company_id)
 
-@router.get("/", response_model=List[JournalEntrySchema])
+def entry_row(entry: JournalEntry) -> dict:
+    """Plain-dict form of JournalEntrySchema, serialized without a Pydantic round trip"""
+    return {
+        "id": entry.id,
+        "company_id": entry.company_id,
+        "date": entry.date,
+        "description": entry.description,
+        "reference": entry.reference,
+        "created_by": entry.created_by,
+        "is_closing": entry.is_closing,
+        "created_at": entry.created_at,
+        "lines": [
+            {
+                "id": line.id,
+                "account_id": line.account_id,
+                "debit": line.debit,
+                "credit": line.credit,
+                "description": line.description
+            }
+            for line in entry.lines
+        ]
+    }
+
+@router.get("/", response_model=List[JournalEntrySchema], response_class=LedgerJSONResponse)
 def read_journal_entries(
     company_id: int,
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    account_id: Optional[int] = None,
+    reference: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
-    entries = db.query(JournalEntry).filter(
+    """List entries newest first. Pass the X-Next-Cursor header back as `cursor` for the next page."""
+    query = db.query(JournalEntry).options(
+        selectinload(JournalEntry.lines)
+    ).filter(
         JournalEntry.company_id == company_id
-    ).order_by(JournalEntry.date.desc()).offset(skip).limit(limit).all()
-    return entries
+    )
+    
+    if start_date:
+        query = query.filter(JournalEntry.date >= start_date)
+    if end_date:
+        query = query.filter(JournalEntry.date <= end_date)
+    if account_id:
+        query = query.filter(JournalEntry.lines.any(JournalLine.account_id == account_id))
+    if reference:
+        query = query.filter(JournalEntry.reference == reference)
+    
+    if cursor:
+        # Keyset pagination: continue strictly after the last (date, id) seen
+        cursor_date, cursor_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            JournalEntry.date < cursor_date,
+            and_(JournalEntry.date == cursor_date, JournalEntry.id < cursor_id)
+        ))
+    elif skip:
+        query = query.offset(skip)
+    
+    entries = query.order_by(
+        JournalEntry.date.desc(), JournalEntry.id.desc()
+    ).limit(limit + 1).all()
+    
+    headers = {}
+    if len(entries) > limit:
+        entries = entries[:limit]
+        last = entries[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(last.date, last.id)
+    return LedgerJSONResponse([entry_row(entry) for entry in entries], headers=headers)
 
 @router.get("/{entry_id}", response_model=JournalEntrySchema)
 def read_journal_entry(
     entry_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     entry = db.query(JournalEntry).filter(JournalEntry.id == entry_id).first()
     if entry is None:
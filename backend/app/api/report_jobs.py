@@ -0,0 +1,212 @@
+import asyncio
+import inspect
+import mimetypes
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from fastapi import Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ConfigDict, ValidationError, create_model
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import SessionLocal, get_db
+from ..models import Company, ReportJob
+from ..models.user import User, UserRole
+from ..models.report_job import ReportJobStatus
+from ..schemas import ReportJobCreate, ReportJob as ReportJobSchema
+from ..core.auth import get_current_active_user, Principal
+from ..core.routing import SessionRouter
+from ..core.report_jobs import ReportJobQueue, cancel_job, finish_job
+from ..core.responses import dumps
+from . import reports
+
+router = SessionRouter()
+
+# Handler arguments supplied by the job runner rather than by the submitted params
+RUNNER_ARGUMENTS = {"company_id", "request", "db", "current_user"}
+
+def _report_name(path: str) -> str:
+    # "/income-statement/{company_id}/comparative" -> "income-statement-comparative"
+    return "-".join(part for part in path.split("/") if part and part != "{company_id}")
+
+def _params_model(endpoint: Callable) -> type:
+    """Pydantic model of a handler's query parameters, so params are checked when a job is submitted"""
+    fields = {}
+    for param in inspect.signature(endpoint).parameters.values():
+        if param.name in RUNNER_ARGUMENTS:
+            continue
+        default = ... if param.default is inspect.Parameter.empty else param.default
+        # Handlers treat a None default as "not given", so it must survive a round trip through JSON
+        annotation = Optional[param.annotation] if getattr(default, "default", default) is None else param.annotation
+        fields[param.name] = (annotation, default)
+    return create_model(f"{endpoint.__name__}_params", __config__=ConfigDict(extra="forbid"), **fields)
+
+def _collect_reports() -> Dict[str, Tuple[Callable, type]]:
+    """Every per-company GET report in api/reports.py, by name"""
+    found = {}
+    for route in reports.router.routes:
+        if "GET" not in route.methods or "{company_id}" not in route.path:
+            continue
+        endpoint = inspect.unwrap(route.endpoint)
+        found[_report_name(route.path)] = (endpoint, _params_model(endpoint))
+    return found
+
+REPORTS = _collect_reports()
+
+def run_report_job(job_id: int) -> None:
+    """Run one claimed job in a pool worker and store its response body"""
+    db = SessionLocal()
+    try:
+        job = db.query(ReportJob).filter(ReportJob.id == job_id).first()
+        if job is None or job.status != ReportJobStatus.RUNNING:
+            return
+        endpoint, params_model = REPORTS[job.report]
+        user = db.query(User).filter(User.id == job.created_by).first()
+        if user is None or not user.is_active:
+            finish_job(db, job_id, ReportJobStatus.FAILED, error="Job creator no longer exists or is inactive")
+            return
+        principal = Principal(id=user.id, email=user.email, role=user.role, is_active=user.is_active)
+        # Failures are recorded on the job; exceptions may not survive the trip back from the worker
+        try:
+            params = dict(params_model(**job.params))
+            supplied = {"company_id": job.company_id, "request": None, "db": db, "current_user": principal}
+            accepted = inspect.signature(endpoint).parameters
+            response = endpoint(**{name: value for name, value in supplied.items() if name in accepted}, **params)
+            body, content_type = _response_body(response)
+        except HTTPException as e:
+            db.rollback()
+            finish_job(db, job_id, ReportJobStatus.FAILED, error=str(e.detail))
+            return
+        except Exception as e:
+            db.rollback()
+            finish_job(db, job_id, ReportJobStatus.FAILED, error=f"{type(e).__name__}: {e}")
+            return
+        db.rollback()
+        finish_job(db, job_id, ReportJobStatus.SUCCEEDED, result=body, content_type=content_type)
+    finally:
+        db.close()
+
+def _response_body(response: Any) -> Tuple[bytes, str]:
+    if isinstance(response, StreamingResponse):
+        # Appended chunk by chunk, so a streamed export is held once rather than as chunks plus their join
+        body = bytearray()
+        async def collect():
+            async for chunk in response.body_iterator:
+                body.extend(chunk if isinstance(chunk, bytes) else chunk.encode())
+        asyncio.run(collect())
+        return body, response.media_type
+    if isinstance(response, Response):
+        return response.body, response.media_type
+    return dumps(response), "application/json"
+
+job_queue = ReportJobQueue(
+    run_report_job,
+    settings.REPORT_JOB_WORKERS,
+    settings.REPORT_JOB_COMPANY_CONCURRENCY,
+    settings.REPORT_JOB_TIMEOUT_SECONDS,
+    settings.REPORT_JOB_RETENTION_SECONDS
+)
+
+def get_visible_job(db: Session, job_id: int, current_user: Principal) -> ReportJob:
+    """A job its creator (or an admin) may see"""
+    job = db.query(ReportJob).filter(ReportJob.id == job_id).first()
+    if job is None or (job.created_by != current_user.id and current_user.role != UserRole.ADMIN):
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return job
+
+@router.get("/reports")
+def list_reports(current_user: Principal = Depends(get_current_active_user)):
+    """Report names that can be submitted, with the params each accepts"""
+    return {
+        name: list(params_model.model_fields)
+        for name, (_, params_model) in sorted(REPORTS.items())
+    }
+
+@router.post("/", response_model=ReportJobSchema, status_code=202)
+def create_report_job(
+    job: ReportJobCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """Queue a report; poll GET /{job_id} and fetch GET /{job_id}/result once it has succeeded"""
+    if job.report not in REPORTS:
+        raise HTTPException(status_code=400, detail=f"Unknown report; one of: {', '.join(sorted(REPORTS))}")
+    try:
+        params = REPORTS[job.report][1](**job.params).model_dump(mode="json")
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+
+    # Verify company exists
+    company = db.query(Company).filter(Company.id == job.company_id).first()
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+
+    db_job = ReportJob(
+        company_id=job.company_id,
+        report=job.report,
+        params=params,
+        priority=job.priority,
+        status=ReportJobStatus.QUEUED,
+        created_by=current_user.id
+    )
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    job_queue.wake()
+    return db_job
+
+@router.get("/", response_model=List[ReportJobSchema])
+def read_report_jobs(
+    company_id: Optional[int] = None,
+    status: Optional[ReportJobStatus] = None,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """The caller's jobs (every user's for admins), newest first"""
+    query = db.query(ReportJob)
+    if current_user.role != UserRole.ADMIN:
+        query = query.filter(ReportJob.created_by == current_user.id)
+    if company_id is not None:
+        query = query.filter(ReportJob.company_id == company_id)
+    if status is not None:
+        query = query.filter(ReportJob.status == status)
+    return query.order_by(ReportJob.id.desc()).limit(limit).all()
+
+@router.get("/{job_id}", response_model=ReportJobSchema)
+def read_report_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    return get_visible_job(db, job_id, current_user)
+
+@router.get("/{job_id}/result")
+def read_report_job_result(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """The finished report, exactly as the report endpoint would have returned it"""
+    job = get_visible_job(db, job_id, current_user)
+    if job.status != ReportJobStatus.SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Report job is {job.status.value}")
+    extension = mimetypes.guess_extension(job.content_type.split(";")[0]) or ""
+    return Response(
+        content=job.result,
+        media_type=job.content_type,
+        headers={"Content-Disposition": f'attachment; filename="{job.report}-{job.id}{extension}"'}
+    )
+
+@router.delete("/{job_id}", response_model=ReportJobSchema)
+def cancel_report_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """Cancel a queued or running job; a running report's result is discarded when it finishes"""
+    job = get_visible_job(db, job_id, current_user)
+    if not cancel_job(db, job):
+        raise HTTPException(status_code=409, detail=f"Report job is already {job.status.value}")
+    db.commit()
+    db.refresh(job)
+    job_queue.wake()
+    return job
@@ -1,35 +1,48 @@
 from typing import List, Dict, Any
 from datetime import date, datetime, timedelta
 from decimal import Decimal
-from fastapi import APIRouter, Depends, HTTPException
+import numpy as np
+from fastapi import Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, case, and_
 from ..database import get_db
-from ..models import Account, JournalLine, Company, User, JournalEntry
+from ..models import Account, JournalLine, Company
 from ..models.account import AccountType
-from ..core.auth import get_current_active_user
+from ..core.auth import get_current_active_user, Principal
+from ..core.routing import SessionRouter
+from ..core.balances import get_period_activity, get_daily_activity, closing_entry_ids, to_decimal, ZERO
+from ..core.amounts import from_minor_array
+from ..core.cache import dashboard_cache
+from ..core.ledger_cache import report_balances
+from ..core.report_cache import CachedReport
+from ..core.responses import LedgerJSONResponse
+from ..core.account_tree import get_account_tree
+from ..core.periods import build_periods, build_series_dates
+from ..core.general_ledger import iter_ledger_rows, parquet_available, STREAMERS, MEDIA_TYPES
 
-router = APIRouter()
+router = SessionRouter(cpu_bound=True)
 
-def get_account_balance(db: Session, account_id: int, end_date: date) -> Decimal:
-    """Calculate account balance up to a specific date"""
-    result = db.query(
-        func.coalesce(func.sum(JournalLine.debit), 0) - func.coalesce(func.sum(JournalLine.credit), 0)
-    ).join(
-        JournalLine.entry
-    ).filter(
-        JournalLine.account_id == account_id,
-        JournalEntry.date <= end_date
-    ).scalar()
-    
-    return Decimal(str(result)) if result else Decimal("0.00")
+def get_report_accounts(db: Session, company: Company, rollup: bool = False):
+    """Accounts for a report; with rollup they come from the cached account tree instead of a query.
 
-@router.get("/balance-sheet/{company_id}")
+    Rolled-up reports list each account with `level` (1 = top level) and its balance
+    including all descendants, down to `depth` levels; section totals are unchanged.
+    """
+    if rollup:
+        tree = get_account_tree(db, company)
+        return [tree.nodes[account_id] for account_id in tree.order]
+    return db.query(Account).filter(Account.company_id == company.id).all()
+
+@router.get("/balance-sheet/{company_id}", response_class=LedgerJSONResponse)
 def get_balance_sheet(
     company_id: int,
+    request: Request,
     as_of_date: date = None,
+    rollup: bool = False,
+    depth: int = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     if not as_of_date:
         as_of_date = date.today()
@@ -39,8 +52,16 @@ def get_balance_sheet(
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
     
+    cached = CachedReport(request, company, "balance-sheet", {
+        "as_of_date": as_of_date,
+        "rollup": rollup,
+        "depth": depth
+    })
+    if cached.response is not None:
+        return cached.response
+    
     # Get all accounts for the company
-    accounts = db.query(Account).filter(Account.company_id == company_id).all()
+    accounts = get_report_accounts(db, company, rollup)
     
     # Structure for balance sheet
     balance_sheet = {
@@ -52,57 +73,82 @@ def get_balance_sheet(
         "total_liabilities_and_equity": Decimal("0.00")
     }
     
-    # Calculate balances for each account
+    # Calculate balances for all accounts in one query
+    balances = report_balances(
+        db, company, end_date=as_of_date,
+        account_types=[AccountType.ASSET, AccountType.LIABILITY, AccountType.EQUITY]
+    )
+    
     for account in accounts:
-        balance = get_account_balance(db, account.id, as_of_date)
+        balance = balances.get(account.id, ZERO)
         
         if balance != 0:
             account_data = {
                 "code": account.code,
                 "name": account.name,
-                "balance": float(balance)
+                "balance": balance
             }
             
             if account.type == AccountType.ASSET:
-                balance_sheet["assets"]["accounts"].append(account_data)
+                if not rollup:
+                    balance_sheet["assets"]["accounts"].append(account_data)
                 balance_sheet["assets"]["total"] += balance
             elif account.type == AccountType.LIABILITY:
-                balance_sheet["liabilities"]["accounts"].append(account_data)
+                if not rollup:
+                    balance_sheet["liabilities"]["accounts"].append(account_data)
                 balance_sheet["liabilities"]["total"] += abs(balance)
             elif account.type == AccountType.EQUITY:
-                balance_sheet["equity"]["accounts"].append(account_data)
+                if not rollup:
+                    balance_sheet["equity"]["accounts"].append(account_data)
                 balance_sheet["equity"]["total"] += abs(balance)
     
+    if rollup:
+        sections = {AccountType.ASSET: "assets", AccountType.LIABILITY: "liabilities", AccountType.EQUITY: "equity"}
+        for account, level, total in get_account_tree(db, company).rollup_rows(balances, depth):
+            if account.type in sections:
+                balance_sheet[sections[account.type]]["accounts"].append({
+                    "code": account.code,
+                    "name": account.name,
+                    "balance": total,
+                    "level": level
+                })
+    
     balance_sheet["total_liabilities_and_equity"] = (
         balance_sheet["liabilities"]["total"] + balance_sheet["equity"]["total"]
     )
     
-    # Convert Decimal to float for JSON serialization
-    balance_sheet["assets"]["total"] = float(balance_sheet["assets"]["total"])
-    balance_sheet["liabilities"]["total"] = float(balance_sheet["liabilities"]["total"])
-    balance_sheet["equity"]["total"] = float(balance_sheet["equity"]["total"])
-    balance_sheet["total_liabilities_and_equity"] = float(balance_sheet["total_liabilities_and_equity"])
-    
-    return balance_sheet
+    return cached.store(balance_sheet)
 
-@router.get("/income-statement/{company_id}")
+@router.get("/income-statement/{company_id}", response_class=LedgerJSONResponse)
 def get_income_statement(
     company_id: int,
+    request: Request,
     start_date: date,
     end_date: date,
+    rollup: bool = False,
+    depth: int = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     # Verify company exists
     company = db.query(Company).filter(Company.id == company_id).first()
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
     
+    cached = CachedReport(request, company, "income-statement", {
+        "start_date": start_date,
+        "end_date": end_date,
+        "rollup": rollup,
+        "depth": depth
+    })
+    if cached.response is not None:
+        return cached.response
+    
     # Get revenue and expense accounts
-    accounts = db.query(Account).filter(
-        Account.company_id == company_id,
-        Account.type.in_([AccountType.REVENUE, AccountType.EXPENSE])
-    ).all()
+    accounts = [
+        account for account in get_report_accounts(db, company, rollup)
+        if account.type in (AccountType.REVENUE, AccountType.EXPENSE)
+    ]
     
     income_statement = {
         "company": company.name,
@@ -112,52 +158,57 @@ def get_income_statement(
         "net_income": Decimal("0.00")
     }
     
-    # Calculate balances for the period
+    # Calculate period activity for all accounts in one query
+    balances = report_balances(
+        db, company, start_date=start_date, end_date=end_date,
+        account_types=[AccountType.REVENUE, AccountType.EXPENSE], exclude_closing=True
+    )
+    
     for account in accounts:
-        # Get period activity
-        result = db.query(
-            func.coalesce(func.sum(JournalLine.credit), 0) - func.coalesce(func.sum(JournalLine.debit), 0)
-        ).join(
-            JournalLine.entry
-        ).filter(
-            JournalLine.account_id == account.id,
-            JournalEntry.date >= start_date,
-            JournalEntry.date <= end_date
-        ).scalar()
-        
-        balance = Decimal(str(result)) if result else Decimal("0.00")
+        balance = -balances.get(account.id, ZERO)
         
         if balance != 0:
             account_data = {
                 "code": account.code,
                 "name": account.name,
-                "balance": float(abs(balance))
+                "balance": abs(balance)
             }
             
             if account.type == AccountType.REVENUE:
-                income_statement["revenue"]["accounts"].append(account_data)
+                if not rollup:
+                    income_statement["revenue"]["accounts"].append(account_data)
                 income_statement["revenue"]["total"] += balance
             elif account.type == AccountType.EXPENSE:
-                income_statement["expenses"]["accounts"].append(account_data)
+                if not rollup:
+                    income_statement["expenses"]["accounts"].append(account_data)
                 income_statement["expenses"]["total"] += abs(balance)
     
+    if rollup:
+        sections = {AccountType.REVENUE: "revenue", AccountType.EXPENSE: "expenses"}
+        for account, level, total in get_account_tree(db, company).rollup_rows(balances, depth):
+            if account.type in sections:
+                income_statement[sections[account.type]]["accounts"].append({
+                    "code": account.code,
+                    "name": account.name,
+                    "balance": abs(total),
+                    "level": level
+                })
+    
     income_statement["net_income"] = (
         income_statement["revenue"]["total"] - income_statement["expenses"]["total"]
     )
     
-    # Convert Decimal to float for JSON serialization
-    income_statement["revenue"]["total"] = float(income_statement["revenue"]["total"])
-    income_statement["expenses"]["total"] = float(income_statement["expenses"]["total"])
-    income_statement["net_income"] = float(income_statement["net_income"])
-    
-    return income_statement
+    return cached.store(income_statement)
 
-@router.get("/trial-balance/{company_id}")
+@router.get("/trial-balance/{company_id}", response_class=LedgerJSONResponse)
 def get_trial_balance(
     company_id: int,
+    request: Request,
     as_of_date: date = None,
+    rollup: bool = False,
+    depth: int = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     if not as_of_date:
         as_of_date = date.today()
@@ -167,8 +218,16 @@ def get_trial_balance(
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
     
+    cached = CachedReport(request, company, "trial-balance", {
+        "as_of_date": as_of_date,
+        "rollup": rollup,
+        "depth": depth
+    })
+    if cached.response is not None:
+        return cached.response
+    
     # Get all accounts with balances
-    accounts = db.query(Account).filter(Account.company_id == company_id).all()
+    accounts = get_report_accounts(db, company, rollup)
     
     trial_balance = {
         "company": company.name,
@@ -178,52 +237,369 @@ def get_trial_balance(
         "total_credit": Decimal("0.00")
     }
     
+    balances = report_balances(db, company, end_date=as_of_date)
+    
     for account in accounts:
-        # Calculate balance
-        result = db.query(
-            func.coalesce(func.sum(JournalLine.debit), 0).label('debit'),
-            func.coalesce(func.sum(JournalLine.credit), 0).label('credit')
-        ).join(
-            JournalLine.entry
-        ).filter(
-            JournalLine.account_id == account.id,
-            JournalEntry.date <= as_of_date
-        ).first()
-        
-        total_debit = Decimal(str(result.debit)) if result.debit else Decimal("0.00")
-        total_credit = Decimal(str(result.credit)) if result.credit else Decimal("0.00")
-        balance = total_debit - total_credit
+        balance = balances.get(account.id, ZERO)
         
         if balance != 0:
             account_data = {
                 "code": account.code,
                 "name": account.name,
                 "type": account.type.value,
-                "debit": float(balance) if balance > 0 else 0,
-                "credit": float(abs(balance)) if balance < 0 else 0
+                "debit": balance if balance > 0 else ZERO,
+                "credit": abs(balance) if balance < 0 else ZERO
             }
-            trial_balance["accounts"].append(account_data)
+            if not rollup:
+                trial_balance["accounts"].append(account_data)
             
             if balance > 0:
                 trial_balance["total_debit"] += balance
             else:
                 trial_balance["total_credit"] += abs(balance)
     
-    # Convert Decimal to float for JSON serialization
-    trial_balance["total_debit"] = float(trial_balance["total_debit"])
-    trial_balance["total_credit"] = float(trial_balance["total_credit"])
+    if rollup:
+        for account, level, total in get_account_tree(db, company).rollup_rows(balances, depth):
+            trial_balance["accounts"].append({
+                "code": account.code,
+                "name": account.name,
+                "type": account.type.value,
+                "debit": total if total > 0 else ZERO,
+                "credit": abs(total) if total < 0 else ZERO,
+                "level": level
+            })
+    
+    return cached.store(trial_balance)
+
+def get_report_periods(company: Company, start_date: date, end_date: date, grain: str):
+    try:
+        return build_periods(start_date, end_date, grain, company.fiscal_year_start)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/income-statement/{company_id}/comparative", response_class=LedgerJSONResponse)
+def get_comparative_income_statement(
+    company_id: int,
+    request: Request,
+    start_date: date,
+    end_date: date,
+    grain: str = "month",
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """Income statement for every month/quarter/fiscal year in the range, from one ledger scan"""
+    # Verify company exists
+    company = db.query(Company).filter(Company.id == company_id).first()
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    cached = CachedReport(request, company, "income-statement-comparative", {
+        "start_date": start_date,
+        "end_date": end_date,
+        "grain": grain
+    })
+    if cached.response is not None:
+        return cached.response
+    
+    periods = get_report_periods(company, start_date, end_date, grain)
+    accounts = db.query(Account).filter(
+        Account.company_id == company_id,
+        Account.type.in_([AccountType.REVENUE, AccountType.EXPENSE])
+    ).order_by(Account.code).all()
+    
+    account_ids, _, activity = get_period_activity(
+        db, company_id, periods, account_types=[AccountType.REVENUE, AccountType.EXPENSE], exclude_closing=True
+    )
+    rows = {account_id: row for account_id, row in zip(account_ids, activity)}
+    
+    # Totals are accumulated in integer cents
+    revenue_totals = np.zeros(len(periods), dtype=np.int64)
+    expense_totals = np.zeros(len(periods), dtype=np.int64)
+    income_statement = {
+        "company": company.name,
+        "grain": grain,
+        "periods": [
+            {"label": period.label, "start": period.start.isoformat(), "end": period.end.isoformat()}
+            for period in periods
+        ],
+        "revenue": {"accounts": [], "totals": []},
+        "expenses": {"accounts": [], "totals": []},
+        "net_income": []
+    }
+    
+    for account in accounts:
+        if account.id not in rows:
+            continue
+        balances = -rows[account.id]
+        account_data = {
+            "code": account.code,
+            "name": account.name,
+            "values": from_minor_array(np.abs(balances))
+        }
+        
+        if account.type == AccountType.REVENUE:
+            income_statement["revenue"]["accounts"].append(account_data)
+            revenue_totals += balances
+        elif account.type == AccountType.EXPENSE:
+            income_statement["expenses"]["accounts"].append(account_data)
+            expense_totals += np.abs(balances)
+    
+    income_statement["revenue"]["totals"] = from_minor_array(revenue_totals)
+    income_statement["expenses"]["totals"] = from_minor_array(expense_totals)
+    income_statement["net_income"] = from_minor_array(revenue_totals - expense_totals)
+    
+    return cached.store(income_statement)
+
+@router.get("/balance-sheet/{company_id}/comparative", response_class=LedgerJSONResponse)
+def get_comparative_balance_sheet(
+    company_id: int,
+    request: Request,
+    start_date: date,
+    end_date: date,
+    grain: str = "month",
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """Balance sheet as of the end of every month/quarter/fiscal year in the range, from one ledger scan"""
+    # Verify company exists
+    company = db.query(Company).filter(Company.id == company_id).first()
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    cached = CachedReport(request, company, "balance-sheet-comparative", {
+        "start_date": start_date,
+        "end_date": end_date,
+        "grain": grain
+    })
+    if cached.response is not None:
+        return cached.response
+    
+    periods = get_report_periods(company, start_date, end_date, grain)
+    balance_types = [AccountType.ASSET, AccountType.LIABILITY, AccountType.EQUITY]
+    accounts = db.query(Account).filter(
+        Account.company_id == company_id,
+        Account.type.in_(balance_types)
+    ).order_by(Account.code).all()
+    
+    account_ids, opening, activity = get_period_activity(
+        db, company_id, periods, account_types=balance_types, include_opening=True
+    )
+    # Closing balance per period is the opening balance plus cumulative movement
+    closing = opening[:, np.newaxis] + np.cumsum(activity, axis=1)
+    rows = {account_id: row for account_id, row in zip(account_ids, closing)}
+    
+    sections = {AccountType.ASSET: "assets", AccountType.LIABILITY: "liabilities", AccountType.EQUITY: "equity"}
+    totals = {name: np.zeros(len(periods), dtype=np.int64) for name in sections.values()}
+    balance_sheet = {
+        "company": company.name,
+        "grain": grain,
+        "periods": [
+            {"label": period.label, "as_of_date": period.end.isoformat()}
+            for period in periods
+        ],
+        "assets": {"accounts": [], "totals": []},
+        "liabilities": {"accounts": [], "totals": []},
+        "equity": {"accounts": [], "totals": []},
+        "total_liabilities_and_equity": []
+    }
+    
+    for account in accounts:
+        balances = rows.get(account.id)
+        if balances is None or not balances.any():
+            continue
+        
+        section = sections[account.type]
+        balance_sheet[section]["accounts"].append({
+            "code": account.code,
+            "name": account.name,
+            "values": from_minor_array(balances)
+        })
+        if account.type == AccountType.ASSET:
+            totals[section] += balances
+        else:
+            totals[section] += np.abs(balances)
+    
+    for section in sections.values():
+        balance_sheet[section]["totals"] = from_minor_array(totals[section])
+    balance_sheet["total_liabilities_and_equity"] = from_minor_array(totals["liabilities"] + totals["equity"])
     
-    return trial_balance
+    return cached.store(balance_sheet)
+
+@router.get("/balance-series/{company_id}", response_class=LedgerJSONResponse)
+def get_balance_series(
+    company_id: int,
+    request: Request,
+    start_date: date,
+    end_date: date,
+    account_id: List[int] = Query(None),
+    grain: str = "day",
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """Balance of each account at the end of every day/week/month in the range, for trend charts.
+
+    Balances carry the account's normal sign: debit - credit for assets and expenses,
+    credit - debit for liabilities, equity and revenue. Pass account_id once per account.
+    """
+    # Verify company exists
+    company = db.query(Company).filter(Company.id == company_id).first()
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    try:
+        points = build_series_dates(start_date, end_date, grain, company.fiscal_year_start)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if not account_id:
+        raise HTTPException(status_code=400, detail="At least one account_id is required")
+    account_ids = list(dict.fromkeys(account_id))
+    accounts = db.query(Account).filter(Account.company_id == company_id, Account.id.in_(account_ids)).all()
+    if len(accounts) != len(account_ids):
+        raise HTTPException(status_code=404, detail="One or more accounts not found or don't belong to this company")
+    
+    cached = CachedReport(request, company, "balance-series", {
+        "start_date": start_date,
+        "end_date": end_date,
+        "account_ids": account_ids,
+        "grain": grain
+    })
+    if cached.response is not None:
+        return cached.response
+    
+    opening, activity = get_daily_activity(db, company_id, account_ids, start_date, end_date)
+    # Running balance per day, sampled at each point
+    daily = opening[:, np.newaxis] + np.cumsum(activity, axis=1)
+    samples = daily[:, [(point - start_date).days for point in points]]
+    rows = {account_id: row for account_id, row in zip(account_ids, samples)}
+    
+    credit_normal = (AccountType.LIABILITY, AccountType.EQUITY, AccountType.REVENUE)
+    accounts_by_id = {account.id: account for account in accounts}
+    return cached.store({
+        "company": company.name,
+        "grain": grain,
+        "dates": [point.isoformat() for point in points],
+        "accounts": [
+            {
+                "id": account.id,
+                "code": account.code,
+                "name": account.name,
+                "type": account.type.value,
+                "values": from_minor_array(-rows[account.id] if account.type in credit_normal else rows[account.id])
+            }
+            for account in (accounts_by_id[account_id] for account_id in account_ids)
+        ]
+    })
+
+@router.get("/general-ledger/{company_id}")
+def get_general_ledger(
+    company_id: int,
+    start_date: date = None,
+    end_date: date = None,
+    account_id: int = None,
+    format: str = "csv",
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """Stream every journal line with a running balance per account as CSV, NDJSON or Parquet"""
+    if not end_date:
+        end_date = date.today()
+    
+    if format not in STREAMERS:
+        raise HTTPException(status_code=400, detail="format must be one of: csv, ndjson, parquet")
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export requires pyarrow to be installed")
+    
+    # Verify company exists
+    company = db.query(Company).filter(Company.id == company_id).first()
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    rows = iter_ledger_rows(company_id, start_date, end_date, account_id)
+    filename = f"general-ledger-{company.code or company.id}-{end_date.isoformat()}.{format}"
+    return StreamingResponse(
+        STREAMERS[format](rows),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+def summarize_companies(db: Session, company_ids: List[int], today: date) -> Dict[int, Dict[str, Decimal]]:
+    """Balance and current-month totals per company, computed in a single grouped query"""
+    start_of_month = today.replace(day=1)
+    to_date = JournalLine.entry_date <= today
+    # Closing entries would zero out revenue and expenses in a year-end month
+    in_month = and_(JournalLine.entry_date >= start_of_month, JournalLine.entry_id.notin_(closing_entry_ids(company_ids)))
+    
+    rows = db.query(
+        JournalLine.company_id,
+        Account.type,
+        func.coalesce(func.sum(case((to_date, JournalLine.debit), else_=0)), 0),
+        func.coalesce(func.sum(case((to_date, JournalLine.credit), else_=0)), 0),
+        func.coalesce(func.sum(case((in_month, JournalLine.debit), else_=0)), 0),
+        func.coalesce(func.sum(case((in_month, JournalLine.credit), else_=0)), 0)
+    ).join(
+        JournalLine.account
+    ).filter(
+        JournalLine.company_id.in_(company_ids)
+    ).group_by(
+        JournalLine.company_id, JournalLine.account_id, Account.type
+    ).all()
+    
+    summaries = {
+        company_id: {
+            "assets": Decimal("0.00"),
+            "liabilities": Decimal("0.00"),
+            "equity": Decimal("0.00"),
+            "revenue": Decimal("0.00"),
+            "expenses": Decimal("0.00")
+        }
+        for company_id in company_ids
+    }
+    
+    # Totals are accumulated per account so abs() applies account by account
+    for company_id, account_type, debit, credit, month_debit, month_credit in rows:
+        summary = summaries[company_id]
+        balance = to_decimal(debit) - to_decimal(credit)
+        
+        if account_type == AccountType.ASSET:
+            summary["assets"] += balance
+        elif account_type == AccountType.LIABILITY:
+            summary["liabilities"] += abs(balance)
+        elif account_type == AccountType.EQUITY:
+            summary["equity"] += abs(balance)
+        elif account_type == AccountType.REVENUE:
+            summary["revenue"] += to_decimal(month_credit) - to_decimal(month_debit)
+        elif account_type == AccountType.EXPENSE:
+            summary["expenses"] += to_decimal(month_debit) - to_decimal(month_credit)
+    
+    for summary in summaries.values():
+        summary["net_income"] = summary["revenue"] - summary["expenses"]
+    
+    return summaries
 
 @router.get("/dashboard/")
 def get_dashboard(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Get dashboard summary data for all companies"""
-    # Get all companies
+    today = date.today()
     companies = db.query(Company).all()
     
+    # Serve companies whose ledger version hasn't moved today from the cache; the
+    # version is bumped in the database, so changes made by other workers count too
+    summaries = {}
+    for company in companies:
+        cached = dashboard_cache.get(company.id, (today, company.ledger_version))
+        if cached is not None:
+            summaries[company.id] = cached
+    
+    stale = {company.id: company.ledger_version for company in companies if company.id not in summaries}
+    if stale:
+        for company_id, summary in summarize_companies(db, list(stale), today).items():
+            dashboard_cache.set(company_id, (today, stale[company_id]), summary)
+            summaries[company_id] = summary
+    
     dashboard_data = {
         "total_assets": Decimal("0.00"),
         "total_liabilities": Decimal("0.00"),
@@ -231,77 +607,27 @@ def get_dashboard(
         "companies": []
     }
     
-    # Calculate totals across all companies
     for company in companies:
-        # Get all accounts for the company
-        accounts = db.query(Account).filter(Account.company_id == company.id).all()
+        summary = summaries[company.id]
+        dashboard_data["total_assets"] += summary["assets"]
+        dashboard_data["total_liabilities"] += summary["liabilities"]
+        dashboard_data["net_income"] += summary["net_income"]
         
-        company_data = {
+        # Deliberately floats, unlike the other reports: the dashboard only charts and rounds them for display
+        dashboard_data["companies"].append({
             "id": company.id,
             "name": company.name,
-            "assets": Decimal("0.00"),
-            "liabilities": Decimal("0.00"),
-            "equity": Decimal("0.00"),
-            "revenue": Decimal("0.00"),
-            "expenses": Decimal("0.00")
-        }
-        
-        # Calculate balances for each account
-        for account in accounts:
-            balance = get_account_balance(db, account.id, date.today())
-            
-            if account.type == AccountType.ASSET:
-                company_data["assets"] += balance
-                dashboard_data["total_assets"] += balance
-            elif account.type == AccountType.LIABILITY:
-                company_data["liabilities"] += abs(balance)
-                dashboard_data["total_liabilities"] += abs(balance)
-            elif account.type == AccountType.EQUITY:
-                company_data["equity"] += abs(balance)
-            elif account.type == AccountType.REVENUE:
-                # Get current month revenue
-                start_of_month = date.today().replace(day=1)
-                result = db.query(
-                    func.coalesce(func.sum(JournalLine.credit), 0) - func.coalesce(func.sum(JournalLine.debit), 0)
-                ).join(
-                    JournalLine.entry
-                ).filter(
-                    JournalLine.account_id == account.id,
-                    JournalEntry.date >= start_of_month
-                ).scalar()
-                revenue = Decimal(str(result)) if result else Decimal("0.00")
-                company_data["revenue"] += revenue
-            elif account.type == AccountType.EXPENSE:
-                # Get current month expenses
-                start_of_month = date.today().replace(day=1)
-                result = db.query(
-                    func.coalesce(func.sum(JournalLine.debit), 0) - func.coalesce(func.sum(JournalLine.credit), 0)
-                ).join(
-                    JournalLine.entry
-                ).filter(
-                    JournalLine.account_id == account.id,
-                    JournalEntry.date >= start_of_month
-                ).scalar()
-                expense = Decimal(str(result)) if result else Decimal("0.00")
-                company_data["expenses"] += expense
-        
-        # Calculate net income for the company (current month)
-        company_data["net_income"] = company_data["revenue"] - company_data["expenses"]
-        dashboard_data["net_income"] += company_data["net_income"]
-        
-        # Convert Decimal to float for JSON serialization
-        company_data["assets"] = float(company_data["assets"])
-        company_data["liabilities"] = float(company_data["liabilities"])
-        company_data["equity"] = float(company_data["equity"])
-        company_data["revenue"] = float(company_data["revenue"])
-        company_data["expenses"] = float(company_data["expenses"])
-        company_data["net_income"] = float(company_data["net_income"])
-        
-        dashboard_data["companies"].append(company_data)
+            "assets": float(summary["assets"]),
+            "liabilities": float(summary["liabilities"]),
+            "equity": float(summary["equity"]),
+            "revenue": float(summary["revenue"]),
+            "expenses": float(summary["expenses"]),
+            "net_income": float(summary["net_income"])
+        })
     
-    # Convert Decimal to float for JSON serialization
+    # Floats as above
     dashboard_data["total_assets"] = float(dashboard_data["total_assets"])
     dashboard_data["total_liabilities"] = float(dashboard_data["total_liabilities"])
     dashboard_data["net_income"] = float(dashboard_data["net_income"])
     
-    return dashboard_data
\ No newline at end of file
+    return dashboard_data
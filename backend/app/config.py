@@ -7,6 +7,63 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "development-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Verified tokens are cached as principals; role/is_active changes in this process evict them
+    AUTH_CACHE_SIZE: int = 1024
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    # Run Alembic migrations on startup; disable when running `alembic upgrade head` at deploy time
+    AUTO_MIGRATE: bool = True
+    # Serve journal, accounts and reports through an async engine (aiosqlite / asyncpg)
+    ASYNC_DATABASE: bool = False
+    # Defaults to DATABASE_URL with the matching async driver
+    ASYNC_DATABASE_URL: Optional[str] = None
+    
+    # Sum journal_lines.amount_minor (integer cents) in reports instead of debit/credit
+    AMOUNT_MINOR_AGGREGATION: bool = True
+    
+    # How long an Idempotency-Key on POST /api/journal/ replays the entry it created
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 86400
+    
+    # Report results cached per (company, report, params, ledger version)
+    REPORT_CACHE_SIZE: int = 256
+    # Optional shared backend, e.g. redis://localhost:6379/0 (requires the redis package)
+    REPORT_CACHE_REDIS_URL: Optional[str] = None
+    REPORT_CACHE_TTL_SECONDS: int = 3600
+    
+    # In-memory columnar ledgers for balance sheet, trial balance and income statement (0 = off);
+    # about 17 bytes per journal line, least recently used companies evicted first
+    LEDGER_CACHE_MAX_BYTES: int = 0
+    
+    # Background report jobs: worker processes per API process (0 = only queue them for app/run_report_jobs.py),
+    # jobs running at once per company, and how long running jobs and finished results are kept
+    REPORT_JOB_WORKERS: int = 0
+    REPORT_JOB_COMPANY_CONCURRENCY: int = 1
+    REPORT_JOB_TIMEOUT_SECONDS: int = 3600
+    REPORT_JOB_RETENTION_SECONDS: int = 86400
+    
+    # Ledger change events for /api/companies/{id}/events: "local" reaches clients of this process only,
+    # "postgres" uses LISTEN/NOTIFY so every API process receives them
+    LEDGER_EVENTS_BACKEND: str = "local"
+    # Lifetime of the ?stream_token= that browsers' EventSource opens the stream with
+    STREAM_TOKEN_EXPIRE_SECONDS: int = 60
+    
+    # Per-route SQL count and DB/handler/serialization time, served on /metrics
+    REQUEST_METRICS: bool = True
+    # Also send a Server-Timing header with each response (visible in browser dev tools)
+    SERVER_TIMING_HEADER: bool = False
+    
+    # Connection pool (ignored for in-memory SQLite)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    
+    # PRAGMAs applied to every SQLite connection
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE: int = -64000  # negative = KiB, i.e. 64 MB
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
     
     class Config:
         env_file = ".env"
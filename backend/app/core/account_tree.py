@@ -0,0 +1,89 @@
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+from sqlalchemy.orm import Session
+from ..models import Account, Company
+from ..models.account import AccountType
+from .balances import ZERO
+from .cache import account_tree_cache
+
+class AccountNode(NamedTuple):
+    id: int
+    code: str
+    name: str
+    type: AccountType
+    parent_id: Optional[int]
+
+class AccountTree:
+    """A company's chart of accounts flattened into pre-order, with levels and parent links.
+
+    Built once per company and cached until an account changes; roll-ups are a
+    single reverse pass over the pre-order list.
+    """
+
+    def __init__(self, accounts: List[AccountNode]):
+        self.nodes: Dict[int, AccountNode] = {account.id: account for account in accounts}
+        self.parent: Dict[int, Optional[int]] = {}
+        self.level: Dict[int, int] = {}
+        self.order: List[int] = []
+
+        children = defaultdict(list)
+        roots = []
+        for node in sorted(accounts, key=lambda account: account.code):
+            if node.parent_id in self.nodes and node.parent_id != node.id:
+                children[node.parent_id].append(node.id)
+            else:
+                roots.append(node.id)
+
+        self._walk(roots, children)
+        # Accounts caught in a parent_id cycle are never reached from a root; treat them as roots
+        orphans = [node_id for node_id in self.nodes if node_id not in self.level]
+        for node_id in sorted(orphans, key=lambda i: self.nodes[i].code):
+            if node_id not in self.level:
+                self._walk([node_id], children)
+
+    def _walk(self, roots, children):
+        stack = [(node_id, None, 1) for node_id in reversed(roots)]
+        while stack:
+            node_id, parent_id, level = stack.pop()
+            if node_id in self.level:
+                continue
+            self.parent[node_id] = parent_id
+            self.level[node_id] = level
+            self.order.append(node_id)
+            for child_id in reversed(children[node_id]):
+                stack.append((child_id, node_id, level + 1))
+
+    def rollup(self, balances: Dict[int, Decimal]) -> Dict[int, Decimal]:
+        """Subtotal of each account including all of its descendants"""
+        totals = {node_id: balances.get(node_id, ZERO) for node_id in self.order}
+        for node_id in reversed(self.order):
+            parent_id = self.parent[node_id]
+            if parent_id is not None:
+                totals[parent_id] += totals[node_id]
+        return totals
+
+    def rollup_rows(
+        self,
+        balances: Dict[int, Decimal],
+        depth: Optional[int] = None
+    ) -> Iterator[Tuple[AccountNode, int, Decimal]]:
+        """Yield (account, level, subtotal) in tree order, down to `depth` levels, skipping zero subtotals"""
+        totals = self.rollup(balances)
+        for node_id in self.order:
+            level = self.level[node_id]
+            if depth is not None and level > depth:
+                continue
+            if totals[node_id] != 0:
+                yield self.nodes[node_id], level, totals[node_id]
+
+def get_account_tree(db: Session, company: Company) -> AccountTree:
+    """The company's account tree, cached per accounts_version so an account change made by any worker rebuilds it"""
+    tree = account_tree_cache.get(company.id, company.accounts_version)
+    if tree is None:
+        rows = db.query(
+            Account.id, Account.code, Account.name, Account.type, Account.parent_id
+        ).filter(Account.company_id == company.id).all()
+        tree = AccountTree([AccountNode(*row) for row in rows])
+        account_tree_cache.set(company.id, company.accounts_version, tree)
+    return tree
@@ -0,0 +1,26 @@
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Iterable, List, Optional
+
+# journal_lines.amount_minor holds cents: debit positive, credit negative
+MINOR_UNIT_DIGITS = 2
+CENT = Decimal(1).scaleb(-MINOR_UNIT_DIGITS)
+
+def to_minor(amount) -> int:
+    """Decimal amount (or SQL aggregate) to integer minor units, rounding half up to the cent"""
+    if not amount:
+        return 0
+    if not isinstance(amount, Decimal):
+        amount = Decimal(str(amount))
+    return int(amount.quantize(CENT, rounding=ROUND_HALF_UP).scaleb(MINOR_UNIT_DIGITS))
+
+def from_minor(value: Optional[int]) -> Decimal:
+    """Integer minor units back to an exact 2-place Decimal"""
+    return Decimal(int(value or 0)).scaleb(-MINOR_UNIT_DIGITS).quantize(CENT)
+
+def line_minor(debit, credit) -> int:
+    """Signed amount_minor for a journal line"""
+    return to_minor(debit) - to_minor(credit)
+
+def from_minor_array(values: Iterable[int]) -> List[Decimal]:
+    """A row of integer cents, e.g. from a NumPy array, as Decimals"""
+    return [from_minor(value) for value in values]
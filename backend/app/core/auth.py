@@ -1,40 +1,109 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import NamedTuple, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect
 from ..config import settings
-from ..database import get_db
+from ..database import SessionLocal
 from ..models import User
+from ..models.user import UserRole
+from .security import create_access_token
+from .token_cache import TokenCache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
+# scope claim of the short-lived tokens that only open one company's event stream
+EVENTS_SCOPE = "events"
+
+class Principal(NamedTuple):
+    """The parts of a User that authorization needs, safe to cache across requests"""
+    id: int
+    email: str
+    role: UserRole
+    is_active: bool
+
+token_cache = TokenCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+
+@event.listens_for(User, "after_update")
+def _invalidate_cached_principal(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.role.history.has_changes() or state.attrs.is_active.history.has_changes():
+        token_cache.invalidate_user(target.id)
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _load_principal(user_id, credentials_exception: HTTPException) -> Principal:
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            raise credentials_exception
+        return Principal(id=user.id, email=user.email, role=user.role, is_active=user.is_active)
+    finally:
+        db.close()
+
+# Plain def so a cache miss's user lookup runs in the thread pool, not on the event loop
+def get_current_user(token: str = Depends(oauth2_scheme)) -> Principal:
+    principal = token_cache.get(token)
+    if principal is not None:
+        return principal
+    
+    credentials_exception = _credentials_exception()
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         user_id: int = payload.get("sub")
-        if user_id is None:
+        # Scoped tokens, such as event stream tokens, are not API access tokens
+        if user_id is None or payload.get("scope") is not None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        raise credentials_exception
-    return user
+    principal = _load_principal(user_id, credentials_exception)
+    token_cache.set(token, principal, payload.get("exp"))
+    return principal
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
+def create_stream_token(user_id: int, company_id: int) -> str:
+    """Short-lived token that opens only this company's event stream, for ?stream_token="""
+    return create_access_token(
+        data={"sub": str(user_id), "scope": EVENTS_SCOPE, "company_id": company_id},
+        expires_delta=timedelta(seconds=settings.STREAM_TOKEN_EXPIRE_SECONDS)
+    )
+
+def get_stream_user(
+    company_id: int,
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    stream_token: Optional[str] = None
+) -> Principal:
+    """get_current_active_user for an event stream, which browsers' EventSource opens without headers.
+
+    Takes the usual Authorization header, or a stream token in the query string;
+    the access token itself is never accepted there, where access logs would record it.
+    """
+    if token:
+        current_user = get_current_user(token)
+    else:
+        credentials_exception = _credentials_exception()
+        try:
+            payload = jwt.decode(stream_token or "", settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError:
+            raise credentials_exception
+        if payload.get("scope") != EVENTS_SCOPE or payload.get("company_id") != company_id or payload.get("sub") is None:
+            raise credentials_exception
+        current_user = _load_principal(payload["sub"], credentials_exception)
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
\ No newline at end of file
+    return current_user
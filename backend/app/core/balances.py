@@ -0,0 +1,467 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from datetime import date, timedelta
+from decimal import Decimal
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, select, update, delete, case, and_, or_, true, cast, type_coerce, BigInteger, Date
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from ..config import settings
+from ..models import Account, JournalLine, AccountPeriodBalance, AccountMonthBalance, AccountOpeningBalance, FiscalYearClose
+from ..models.account import AccountType
+from .amounts import from_minor, to_minor
+from .periods import add_months
+
+ZERO = Decimal("0.00")
+UPSERT_INSERTS = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
+_period_activity_upserts = {}
+# Day or month column of each snapshot table
+SNAPSHOT_DATE_COLUMNS = {AccountPeriodBalance: "period_date", AccountMonthBalance: "month_start"}
+
+def to_decimal(value) -> Decimal:
+    """Normalise a SQL aggregate result to Decimal"""
+    return Decimal(str(value)) if value else ZERO
+
+def get_snapshot_date(db: Session, company_id: int) -> Optional[date]:
+    """Last day covered by the period balance snapshot, or None if it has not been built"""
+    return db.query(func.max(AccountPeriodBalance.period_date)).filter(
+        AccountPeriodBalance.company_id == company_id
+    ).scalar()
+
+def get_opening_date(db: Session, company_id: int, on_or_before: Optional[date] = None) -> Optional[date]:
+    """Start of the latest fiscal year with carried-forward opening balances, on or before a date"""
+    query = db.query(func.max(AccountOpeningBalance.period_start)).filter(
+        AccountOpeningBalance.company_id == company_id
+    )
+    if on_or_before is not None:
+        query = query.filter(AccountOpeningBalance.period_start <= on_or_before)
+    return query.scalar()
+
+def _opening_totals(db, company_id, period_start, account_types):
+    query = db.query(
+        AccountOpeningBalance.account_id,
+        AccountOpeningBalance.debit,
+        AccountOpeningBalance.credit
+    ).filter(
+        AccountOpeningBalance.company_id == company_id,
+        AccountOpeningBalance.period_start == period_start
+    )
+    if account_types is not None:
+        query = query.join(AccountOpeningBalance.account).filter(Account.type.in_(account_types))
+    return query
+
+def _snapshot_totals(db, company_id, start_date, end_date, account_types):
+    """Snapshot activity over a date range: monthly rows for the whole months inside it, daily rows for the rest.
+
+    An account therefore contributes at most one row per month plus the days of
+    the partial months at either end, however many days it was active.
+    """
+    # Whole months are those starting on or after first_month and before end_month
+    end_month = (end_date + timedelta(days=1)).replace(day=1)
+    first_month = None
+    if start_date is not None:
+        first_month = start_date if start_date.day == 1 else add_months(start_date.replace(day=1), 1)
+
+    rows = []
+    if first_month is None or first_month < end_month:
+        months = db.query(
+            AccountMonthBalance.account_id,
+            func.coalesce(func.sum(AccountMonthBalance.debit), 0),
+            func.coalesce(func.sum(AccountMonthBalance.credit), 0)
+        ).filter(
+            AccountMonthBalance.company_id == company_id,
+            AccountMonthBalance.month_start < end_month
+        )
+        if first_month is not None:
+            months = months.filter(AccountMonthBalance.month_start >= first_month)
+        if account_types is not None:
+            months = months.join(AccountMonthBalance.account).filter(Account.type.in_(account_types))
+        rows.extend(months.group_by(AccountMonthBalance.account_id))
+        outside_months = AccountPeriodBalance.period_date >= end_month
+        if first_month is not None:
+            outside_months = or_(AccountPeriodBalance.period_date < first_month, outside_months)
+    else:
+        outside_months = true()
+
+    days = db.query(
+        AccountPeriodBalance.account_id,
+        func.coalesce(func.sum(AccountPeriodBalance.debit), 0),
+        func.coalesce(func.sum(AccountPeriodBalance.credit), 0)
+    ).filter(
+        AccountPeriodBalance.company_id == company_id,
+        AccountPeriodBalance.period_date <= end_date,
+        outside_months
+    )
+    if start_date is not None:
+        days = days.filter(AccountPeriodBalance.period_date >= start_date)
+    if account_types is not None:
+        days = days.join(AccountPeriodBalance.account).filter(Account.type.in_(account_types))
+    rows.extend(days.group_by(AccountPeriodBalance.account_id))
+    return rows
+
+def closing_entry_ids(company_ids: Iterable[int]):
+    """Subquery of the closing entries posted by period closes, which fiscal_year_closes links"""
+    return select(FiscalYearClose.closing_entry_id).where(
+        FiscalYearClose.company_id.in_(list(company_ids)),
+        FiscalYearClose.closing_entry_id.isnot(None)
+    )
+
+def accounts_of_types(company_id: int, account_types: Iterable[AccountType]):
+    """Subquery of a company's account ids of the given types, to filter lines without a join"""
+    return select(Account.id).where(Account.company_id == company_id, Account.type.in_(list(account_types)))
+
+def _line_totals(db, company_id, start_date, end_date, account_types, after_date=None, closing_only=False):
+    if settings.AMOUNT_MINOR_AGGREGATION:
+        # Net and gross cents; debit = (gross + net) / 2, credit = (gross - net) / 2
+        columns = (
+            func.coalesce(func.sum(JournalLine.amount_minor), 0),
+            func.coalesce(func.sum(func.abs(JournalLine.amount_minor)), 0)
+        )
+    else:
+        columns = (
+            func.coalesce(func.sum(JournalLine.debit), 0),
+            func.coalesce(func.sum(JournalLine.credit), 0)
+        )
+    query = db.query(
+        JournalLine.account_id, *columns
+    ).filter(
+        JournalLine.company_id == company_id
+    )
+
+    if start_date is not None:
+        query = query.filter(JournalLine.entry_date >= start_date)
+    if end_date is not None:
+        query = query.filter(JournalLine.entry_date <= end_date)
+    if after_date is not None:
+        query = query.filter(JournalLine.entry_date > after_date)
+    if closing_only:
+        query = query.filter(JournalLine.entry_id.in_(closing_entry_ids([company_id])))
+    if account_types is not None:
+        query = query.filter(JournalLine.account_id.in_(accounts_of_types(company_id, account_types)))
+
+    query = query.group_by(JournalLine.account_id)
+    if settings.AMOUNT_MINOR_AGGREGATION:
+        # Integer sums are exact on every backend; convert cents once per account
+        return [
+            (account_id, from_minor((int(gross) + int(net)) // 2), from_minor((int(gross) - int(net)) // 2))
+            for account_id, net, gross in query
+        ]
+    return query
+
+def get_account_totals(
+    db: Session,
+    company_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    account_types: Optional[Iterable[AccountType]] = None,
+    exclude_closing: bool = False
+) -> Dict[int, Tuple[Decimal, Decimal]]:
+    """Return {account_id: (total_debit, total_credit)} for a company.
+
+    Cumulative totals (no start_date) begin from the opening balances of the latest
+    closed fiscal year, so history before it is never scanned. Days up to the snapshot
+    date are read from AccountPeriodBalance; only journal lines posted after it are
+    aggregated directly. exclude_closing leaves out closing entries, as income
+    statement activity should.
+    """
+    if account_types is not None:
+        account_types = list(account_types)
+
+    rows = []
+    if start_date is None:
+        opening_date = get_opening_date(db, company_id, end_date)
+        if opening_date is not None:
+            rows.extend(_opening_totals(db, company_id, opening_date, account_types))
+            start_date = opening_date
+
+    snapshot_date = get_snapshot_date(db, company_id)
+    if snapshot_date is None:
+        rows.extend(_line_totals(db, company_id, start_date, end_date, account_types))
+    else:
+        snapshot_end = snapshot_date if end_date is None else min(end_date, snapshot_date)
+        if start_date is None or start_date <= snapshot_end:
+            rows.extend(_snapshot_totals(db, company_id, start_date, snapshot_end, account_types))
+        if end_date is None or end_date > snapshot_date:
+            rows.extend(_line_totals(db, company_id, start_date, end_date, account_types, after_date=snapshot_date))
+    if exclude_closing:
+        rows.extend(
+            (account_id, -to_decimal(debit), -to_decimal(credit))
+            for account_id, debit, credit in _line_totals(
+                db, company_id, start_date, end_date, account_types, closing_only=True
+            )
+        )
+
+    totals = {}
+    for account_id, debit, credit in rows:
+        prev_debit, prev_credit = totals.get(account_id, (ZERO, ZERO))
+        totals[account_id] = (prev_debit + to_decimal(debit), prev_credit + to_decimal(credit))
+    return totals
+
+def get_account_balances(
+    db: Session,
+    company_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    account_types: Optional[Iterable[AccountType]] = None,
+    exclude_closing: bool = False
+) -> Dict[int, Decimal]:
+    """Return {account_id: debit - credit} for a company"""
+    totals = get_account_totals(db, company_id, start_date, end_date, account_types, exclude_closing)
+    return {account_id: debit - credit for account_id, (debit, credit) in totals.items()}
+
+def get_period_activity(
+    db: Session,
+    company_id: int,
+    periods: Sequence,
+    account_types: Optional[Iterable[AccountType]] = None,
+    include_opening: bool = False,
+    exclude_closing: bool = False
+) -> Tuple[List[int], np.ndarray, np.ndarray]:
+    """Net movement in cents per account for each period, bucketed by a CASE over entry date in one scan.
+
+    Returns (account_ids, opening, activity) as int64 arrays: activity[i, j] is the
+    debit - credit of account_ids[i] in periods[j]; opening[i] is its balance before
+    the first period when include_opening is set (for closing-balance comparatives),
+    otherwise zero. The opening scan starts from the latest carried-forward opening
+    balances before the first period.
+    """
+    if account_types is not None:
+        account_types = list(account_types)
+    opening_date = get_opening_date(db, company_id, periods[0].start) if include_opening else None
+
+    whens = [
+        (and_(JournalLine.entry_date >= period.start, JournalLine.entry_date <= period.end), index)
+        for index, period in enumerate(periods)
+    ]
+    if include_opening:
+        whens.insert(0, (JournalLine.entry_date < periods[0].start, -1))
+    bucket = case(*whens, else_=None)
+    if settings.AMOUNT_MINOR_AGGREGATION:
+        amount = func.coalesce(func.sum(JournalLine.amount_minor), 0)
+    else:
+        amount = func.coalesce(func.sum(JournalLine.debit), 0) - func.coalesce(func.sum(JournalLine.credit), 0)
+
+    query = db.query(
+        JournalLine.account_id, bucket, amount
+    ).filter(
+        JournalLine.company_id == company_id,
+        JournalLine.entry_date <= periods[-1].end
+    )
+    if not include_opening:
+        query = query.filter(JournalLine.entry_date >= periods[0].start)
+    elif opening_date is not None:
+        query = query.filter(JournalLine.entry_date >= opening_date)
+    if exclude_closing:
+        query = query.filter(JournalLine.entry_id.notin_(closing_entry_ids([company_id])))
+    if account_types is not None:
+        query = query.filter(JournalLine.account_id.in_(accounts_of_types(company_id, account_types)))
+
+    to_cents = int if settings.AMOUNT_MINOR_AGGREGATION else to_minor
+    rows = [
+        (account_id, index, to_cents(value))
+        for account_id, index, value in query.group_by(JournalLine.account_id, bucket)
+        if index is not None
+    ]
+    if opening_date is not None:
+        rows.extend(
+            (account_id, -1, to_minor(debit) - to_minor(credit))
+            for account_id, debit, credit in _opening_totals(db, company_id, opening_date, account_types)
+        )
+
+    account_ids = sorted({account_id for account_id, _, _ in rows})
+    position = {account_id: i for i, account_id in enumerate(account_ids)}
+    opening = np.zeros(len(account_ids), dtype=np.int64)
+    activity = np.zeros((len(account_ids), len(periods)), dtype=np.int64)
+    for account_id, index, value in rows:
+        if index == -1:
+            opening[position[account_id]] += value
+        else:
+            activity[position[account_id], index] = value
+    return account_ids, opening, activity
+
+def get_daily_activity(
+    db: Session,
+    company_id: int,
+    account_ids: Sequence[int],
+    start_date: date,
+    end_date: date
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Balance before start_date and net movement per day in cents for the given accounts, in one scan.
+
+    Returns (opening, activity) as int64 arrays: opening[i] is the debit - credit of
+    account_ids[i] up to the day before start_date, and activity[i, d] its movement on
+    start_date + d days. Days before start_date are grouped into one opening bucket,
+    starting from the latest carried-forward opening balances.
+    """
+    opening_date = get_opening_date(db, company_id, start_date)
+    # Coerced so SQLite's text result is still read back as a date
+    day = type_coerce(case((JournalLine.entry_date < start_date, None), else_=JournalLine.entry_date), Date)
+    if settings.AMOUNT_MINOR_AGGREGATION:
+        amount = func.coalesce(func.sum(JournalLine.amount_minor), 0)
+    else:
+        amount = func.coalesce(func.sum(JournalLine.debit), 0) - func.coalesce(func.sum(JournalLine.credit), 0)
+
+    query = db.query(
+        JournalLine.account_id, day, amount
+    ).filter(
+        JournalLine.company_id == company_id,
+        JournalLine.account_id.in_(list(account_ids)),
+        JournalLine.entry_date <= end_date
+    )
+    if opening_date is not None:
+        query = query.filter(JournalLine.entry_date >= opening_date)
+
+    position = {account_id: i for i, account_id in enumerate(account_ids)}
+    opening = np.zeros(len(account_ids), dtype=np.int64)
+    activity = np.zeros((len(account_ids), (end_date - start_date).days + 1), dtype=np.int64)
+    to_cents = int if settings.AMOUNT_MINOR_AGGREGATION else to_minor
+    for account_id, entry_date, value in query.group_by(JournalLine.account_id, day):
+        if entry_date is None:
+            opening[position[account_id]] += to_cents(value)
+        else:
+            activity[position[account_id], (entry_date - start_date).days] = to_cents(value)
+    if opening_date is not None:
+        for account_id, debit, credit in _opening_totals(db, company_id, opening_date, None).filter(
+            AccountOpeningBalance.account_id.in_(list(account_ids))
+        ):
+            opening[position[account_id]] += to_minor(debit) - to_minor(credit)
+    return opening, activity
+
+def get_period_activity_upsert(dialect: str, model=AccountPeriodBalance):
+    """INSERT ... ON CONFLICT DO UPDATE adding to existing days (or months) and creating missing ones, or None"""
+    if dialect not in UPSERT_INSERTS:
+        return None
+    if (dialect, model) not in _period_activity_upserts:
+        table = model.__table__
+        statement = UPSERT_INSERTS[dialect](table)
+        _period_activity_upserts[(dialect, model)] = statement.on_conflict_do_update(
+            index_elements=[table.c.account_id, table.c[SNAPSHOT_DATE_COLUMNS[model]]],
+            set_={
+                "debit": table.c.debit + statement.excluded.debit,
+                "credit": table.c.credit + statement.excluded.credit
+            }
+        )
+    return _period_activity_upserts[(dialect, model)]
+
+def _add_activity(db: Session, model, company_id: int, cents: Dict[Tuple[int, date], Tuple[int, int]]) -> None:
+    """Add {(account_id, day or month): (debit, credit) cents} to the snapshot rows of model"""
+    date_column = SNAPSHOT_DATE_COLUMNS[model]
+    upsert = get_period_activity_upsert(db.get_bind().dialect.name, model)
+    if upsert is not None:
+        db.execute(
+            upsert,
+            [
+                {
+                    "company_id": company_id,
+                    "account_id": account_id,
+                    date_column: period,
+                    "debit": from_minor(debit),
+                    "credit": from_minor(credit)
+                }
+                for (account_id, period), (debit, credit) in cents.items()
+            ]
+        )
+        return
+
+    period_column = getattr(model, date_column)
+    existing = {
+        (row.account_id, getattr(row, date_column)): row
+        for row in db.query(model).filter(
+            model.account_id.in_({account_id for account_id, _ in cents}),
+            period_column.in_({period for _, period in cents})
+        )
+    }
+    for (account_id, period), (debit, credit) in cents.items():
+        row = existing.get((account_id, period))
+        if row is None:
+            db.add(model(
+                company_id=company_id,
+                account_id=account_id,
+                debit=from_minor(debit),
+                credit=from_minor(credit),
+                **{date_column: period}
+            ))
+        else:
+            row.debit = to_decimal(row.debit) + from_minor(debit)
+            row.credit = to_decimal(row.credit) + from_minor(credit)
+
+def _month_cents(daily: Dict[Tuple[int, date], Tuple[int, int]]) -> Dict[Tuple[int, date], Tuple[int, int]]:
+    """Roll {(account_id, day): (debit, credit)} cents up to month starts"""
+    months = {}
+    for (account_id, day), (debit, credit) in daily.items():
+        key = (account_id, day.replace(day=1))
+        month_debit, month_credit = months.get(key, (0, 0))
+        months[key] = (month_debit + debit, month_credit + credit)
+    return months
+
+def record_period_activity(db: Session, company_id: int, entry_date: date, lines: Iterable[dict]) -> None:
+    """Fold a posted entry's lines, as inserted ({account_id, debit, credit}), into the snapshot within the caller's transaction"""
+    record_period_activity_many(db, company_id, [(entry_date, lines)])
+
+def record_period_activity_many(db: Session, company_id: int, postings) -> None:
+    """Fold several (entry_date, lines) postings into the daily and monthly snapshot at once.
+
+    Once a company's snapshot is built it covers every line, so postings on any
+    date are recorded, adding days past the snapshot date as they come; only
+    companies never rebuilt are left to the line scan.
+    """
+    if get_snapshot_date(db, company_id) is None:
+        return
+
+    cents = {}
+    for entry_date, lines in postings:
+        for line in lines:
+            key = (line["account_id"], entry_date)
+            debit, credit = cents.get(key, (0, 0))
+            cents[key] = (debit + to_minor(line["debit"]), credit + to_minor(line["credit"]))
+    if not cents:
+        return
+    _add_activity(db, AccountPeriodBalance, company_id, cents)
+    _add_activity(db, AccountMonthBalance, company_id, _month_cents(cents))
+
+def rebuild_period_balances(db: Session, company_id: int) -> int:
+    """Regenerate a company's daily and monthly snapshot from all of its journal lines, summed in cents as reports are"""
+    db.execute(delete(AccountPeriodBalance).where(AccountPeriodBalance.company_id == company_id))
+    db.execute(delete(AccountMonthBalance).where(AccountMonthBalance.company_id == company_id))
+
+    debit = case((JournalLine.amount_minor > 0, JournalLine.amount_minor), else_=0)
+    credit = case((JournalLine.amount_minor < 0, -JournalLine.amount_minor), else_=0)
+    activity = db.query(
+        JournalLine.account_id,
+        JournalLine.entry_date,
+        func.coalesce(func.sum(debit), 0),
+        func.coalesce(func.sum(credit), 0)
+    ).filter(
+        JournalLine.company_id == company_id
+    ).group_by(
+        JournalLine.account_id, JournalLine.entry_date
+    )
+
+    daily = {
+        (account_id, entry_date): (int(debit), int(credit))
+        for account_id, entry_date, debit, credit in activity
+    }
+    for model, cents in ((AccountPeriodBalance, daily), (AccountMonthBalance, _month_cents(daily))):
+        if cents:
+            db.execute(insert(model), [
+                {
+                    "company_id": company_id,
+                    "account_id": account_id,
+                    SNAPSHOT_DATE_COLUMNS[model]: period,
+                    "debit": from_minor(debit),
+                    "credit": from_minor(credit)
+                }
+                for (account_id, period), (debit, credit) in cents.items()
+            ])
+    return len(daily)
+
+def backfill_amount_minor(db: Session, company_id: Optional[int] = None) -> int:
+    """Fill journal_lines.amount_minor for lines written without it (e.g. by direct SQL)"""
+    query = update(JournalLine).where(JournalLine.amount_minor.is_(None)).values(
+        amount_minor=cast(func.round(
+            (func.coalesce(JournalLine.debit, 0) - func.coalesce(JournalLine.credit, 0)) * 100
+        ), BigInteger)
+    )
+    if company_id is not None:
+        query = query.where(JournalLine.company_id == company_id)
+    return db.execute(query.execution_options(synchronize_session=False)).rowcount
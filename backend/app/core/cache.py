@@ -0,0 +1,90 @@
+import threading
+from typing import Any, Dict, Hashable, Iterable, Optional, Set, Tuple
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from ..models import Account, Company
+
+class CompanyCache:
+    """Thread-safe in-process cache of per-company values, dropped when the company's ledger changes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[int, Dict[Hashable, Any]] = {}
+
+    def get(self, company_id: int, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            return self._values.get(company_id, {}).get(key)
+
+    def set(self, company_id: int, key: Hashable, value: Any) -> None:
+        with self._lock:
+            # Only the latest key per company is kept, e.g. the dashboard figures for today's ledger version
+            self._values[company_id] = {key: value}
+
+    def invalidate(self, company_id: int) -> None:
+        with self._lock:
+            self._values.pop(company_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+class AccountIdCache:
+    """Per-company set of account ids used to validate postings without a query.
+
+    Ids are cached per accounts_version, which every account create and update
+    bumps in the database, so accounts created or moved away by any worker are
+    seen by the next posting. Pass the version read under the posting's company
+    row lock (begin_posting), so it cannot change before the posting commits.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids: Dict[int, Tuple[int, Set[int]]] = {}
+
+    def unknown(self, db: Session, company_id: int, accounts_version: int, account_ids: Iterable[int]) -> Set[int]:
+        """The given account ids that do not belong to the company"""
+        wanted = set(account_ids)
+        with self._lock:
+            item = self._ids.get(company_id)
+        if item is not None and item[0] == accounts_version:
+            return wanted - item[1]
+        known = {account_id for account_id, in db.query(Account.id).filter(Account.company_id == company_id)}
+        with self._lock:
+            self._ids[company_id] = (accounts_version, known)
+        return wanted - known
+
+    def invalidate(self, company_id: int) -> None:
+        with self._lock:
+            self._ids.pop(company_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
+
+dashboard_cache = CompanyCache()
+account_tree_cache = CompanyCache()
+account_id_cache = AccountIdCache()
+
+def invalidate_company(company_id: int) -> None:
+    """Drop every cached result derived from a company's ledger or chart of accounts"""
+    dashboard_cache.invalidate(company_id)
+    account_tree_cache.invalidate(company_id)
+
+
+def bump_accounts_version(db: Session, company_id: int) -> None:
+    """Advance a company's accounts and ledger versions inside the caller's transaction, after an account change"""
+    db.execute(
+        update(Company)
+        .where(Company.id == company_id)
+        .values(accounts_version=Company.accounts_version + 1, ledger_version=Company.ledger_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+def bump_ledger_version(db: Session, company_id: int) -> None:
+    """Advance a company's ledger version inside the caller's transaction, retiring cached reports"""
+    db.execute(
+        update(Company)
+        .where(Company.id == company_id)
+        .values(ledger_version=Company.ledger_version + 1)
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,188 @@
+import csv
+import io
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterator, List, Optional
+from ..database import SessionLocal
+from ..models import Account, JournalLine, JournalEntry
+from .balances import get_account_balances, ZERO
+
+BATCH_SIZE = 1000
+
+COLUMNS = [
+    "account_code", "account_name", "date", "entry_id", "reference",
+    "description", "debit", "credit", "balance"
+]
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+def iter_ledger_rows(
+    company_id: int,
+    start_date: Optional[date],
+    end_date: date,
+    account_id: Optional[int] = None
+) -> Iterator[dict]:
+    """Yield general ledger rows ordered by account and date, with a running balance per account.
+
+    Uses its own session because streaming outlives the request's dependencies;
+    rows are fetched with yield_per so memory stays flat for any ledger size.
+    """
+    db = SessionLocal()
+    try:
+        opening = {}
+        if start_date is not None:
+            opening = get_account_balances(db, company_id, end_date=start_date - timedelta(days=1))
+
+        query = db.query(
+            Account.id, Account.code, Account.name,
+            JournalLine.entry_date, JournalLine.entry_id, JournalEntry.reference, JournalEntry.description,
+            JournalLine.description, JournalLine.debit, JournalLine.credit
+        ).join(
+            JournalLine.entry
+        ).join(
+            JournalLine.account
+        ).filter(
+            JournalLine.company_id == company_id,
+            JournalLine.entry_date <= end_date
+        )
+        if start_date is not None:
+            query = query.filter(JournalLine.entry_date >= start_date)
+        if account_id is not None:
+            query = query.filter(JournalLine.account_id == account_id)
+
+        query = query.order_by(
+            Account.code, JournalLine.entry_date, JournalLine.entry_id, JournalLine.id
+        ).execution_options(yield_per=BATCH_SIZE)
+
+        current_account = None
+        balance = ZERO
+        for (acct_id, code, name, entry_date, entry_id, reference, entry_description,
+             line_description, debit, credit) in query:
+            if acct_id != current_account:
+                current_account = acct_id
+                balance = opening.get(acct_id, ZERO)
+                if start_date is not None:
+                    yield {
+                        "account_code": code, "account_name": name, "date": start_date.isoformat(),
+                        "entry_id": None, "reference": None, "description": "Opening balance",
+                        "debit": None, "credit": None, "balance": str(balance)
+                    }
+            debit = debit or ZERO
+            credit = credit or ZERO
+            balance += debit - credit
+            yield {
+                "account_code": code,
+                "account_name": name,
+                "date": entry_date.isoformat(),
+                "entry_id": entry_id,
+                "reference": reference,
+                "description": line_description or entry_description,
+                "debit": str(debit),
+                "credit": str(credit),
+                "balance": str(balance)
+            }
+    finally:
+        db.close()
+
+def stream_csv(rows: Iterator[dict]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=COLUMNS)
+    writer.writeheader()
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def stream_ndjson(rows: Iterator[dict]) -> Iterator[str]:
+    batch: List[str] = []
+    for row in rows:
+        batch.append(json.dumps(row))
+        if len(batch) >= BATCH_SIZE:
+            yield "\n".join(batch) + "\n"
+            batch = []
+    if batch:
+        yield "\n".join(batch) + "\n"
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to the generator"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def stream_parquet(rows: Iterator[dict]) -> Iterator[bytes]:
+    """Write one Parquet row group per batch, yielding bytes as they are produced"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("account_code", pa.string()),
+        ("account_name", pa.string()),
+        ("date", pa.date32()),
+        ("entry_id", pa.int64()),
+        ("reference", pa.string()),
+        ("description", pa.string()),
+        ("debit", pa.decimal128(38, 2)),
+        ("credit", pa.decimal128(38, 2)),
+        ("balance", pa.decimal128(38, 2)),
+    ])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+
+    def write_batch(batch):
+        writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+        return sink.drain()
+
+    batch: List[dict] = []
+    for row in rows:
+        row["date"] = date.fromisoformat(row["date"])
+        for field in ("debit", "credit", "balance"):
+            if row[field] is not None:
+                row[field] = Decimal(row[field])
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            yield write_batch(batch)
+            batch = []
+    if batch:
+        yield write_batch(batch)
+    writer.close()
+    yield sink.drain()
+
+STREAMERS = {
+    "csv": stream_csv,
+    "ndjson": stream_ndjson,
+    "parquet": stream_parquet,
+}
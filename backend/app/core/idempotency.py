@@ -0,0 +1,67 @@
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..models import IdempotencyKey
+from ..schemas import JournalEntryCreate
+from .responses import dumps
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IDEMPOTENT_REPLAY_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+# Expired keys are deleted by at most one posting per interval in each process
+PURGE_INTERVAL_SECONDS = 300
+
+_purge_lock = threading.Lock()
+_last_purge = 0.0
+
+def request_fingerprint(entry: JournalEntryCreate) -> str:
+    return hashlib.sha256(dumps(entry.dict())).hexdigest()
+
+def find_idempotent_entry_id(db: Session, user_id: int, key: str, fingerprint: str) -> Optional[int]:
+    """Entry id already posted under a user's key, or None if the key is new or has expired"""
+    record = db.query(IdempotencyKey).filter(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.key == key
+    ).first()
+    if record is None:
+        return None
+    if record.expires_at <= datetime.utcnow():
+        # Free the key for reuse within this posting's transaction
+        db.delete(record)
+        db.flush()
+        return None
+    if record.request_hash != fingerprint:
+        raise ValueError(f"{IDEMPOTENCY_KEY_HEADER} was already used for a different journal entry")
+    return record.entry_id
+
+def remember_idempotency_key(db: Session, user_id: int, key: str, fingerprint: str, entry_id: int) -> None:
+    """Record a key against the entry just posted, within the caller's transaction.
+
+    A concurrent request with the same key makes this (or the commit) raise IntegrityError.
+    """
+    db.execute(insert(IdempotencyKey.__table__), {
+        "user_id": user_id,
+        "key": key,
+        "request_hash": fingerprint,
+        "entry_id": entry_id,
+        "expires_at": datetime.utcnow() + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS)
+    })
+    _purge_expired_if_due(db)
+
+def purge_expired_idempotency_keys(db: Session) -> int:
+    """Delete keys past their TTL, returning how many were removed"""
+    result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.utcnow()))
+    return result.rowcount
+
+def _purge_expired_if_due(db: Session) -> None:
+    global _last_purge
+    with _purge_lock:
+        if time.monotonic() - _last_purge < PURGE_INTERVAL_SECONDS:
+            return
+        _last_purge = time.monotonic()
+    purge_expired_idempotency_keys(db)
@@ -0,0 +1,238 @@
+import csv
+import json
+from typing import Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from ..models import Account, Company, JournalEntry, JournalLine
+from ..schemas import JournalEntryCreate
+from .amounts import from_minor, line_minor, to_minor
+from .balances import record_period_activity_many
+from .cache import invalidate_company
+from .ledger_cache import ledger_cache
+from .ledger_events import entries_imported_event, publish_ledger_event
+from .posting import begin_posting, returned_ids
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+# Unordered RETURNING batches on every dialect; ids are matched back on these columns
+INSERT_ENTRIES = insert(JournalEntry.__table__).returning(
+    JournalEntry.id, JournalEntry.date, JournalEntry.description, JournalEntry.reference
+)
+
+CSV_ENTRY_FIELDS = ("date", "description", "reference")
+
+class ImportRowError(Exception):
+    """Raised for a single source row that cannot be turned into an entry"""
+
+def iter_ndjson(stream: TextIO) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (line_number, entry_dict, error) for each non-blank NDJSON line"""
+    for row_number, raw in enumerate(stream, start=1):
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            data = json.loads(raw)
+        except ValueError as e:
+            yield row_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(data, dict):
+            yield row_number, None, "Each line must be a JSON object"
+            continue
+        yield row_number, data, None
+
+def iter_csv(stream: TextIO) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (row_number, entry_dict, error) from a CSV with one journal line per row.
+
+    Consecutive rows sharing the same ``entry`` value (or, without that column,
+    the same date/description/reference) are grouped into one entry. Lines name
+    their account with ``account_id`` or ``account_code``.
+    """
+    reader = csv.DictReader(stream)
+    current_key = None
+    current = None
+    first_row = None
+
+    for row_number, row in enumerate(reader, start=2):
+        key = row.get("entry") or tuple(row.get(field) for field in CSV_ENTRY_FIELDS)
+        if key != current_key:
+            if current is not None:
+                yield first_row, current, None
+            current_key = key
+            first_row = row_number
+            current = {field: row.get(field) or None for field in CSV_ENTRY_FIELDS}
+            current["lines"] = []
+        current["lines"].append({
+            "account_id": row.get("account_id") or None,
+            "account_code": row.get("account_code") or None,
+            "debit": row.get("debit") or "0",
+            "credit": row.get("credit") or "0",
+            "description": row.get("line_description") or None
+        })
+
+    if current is not None:
+        yield first_row, current, None
+
+def _format_validation_error(e: ValidationError) -> str:
+    messages = []
+    for error in e.errors():
+        location = ".".join(str(part) for part in error["loc"])
+        messages.append(f"{location}: {error['msg']}" if location else error["msg"])
+    return "; ".join(messages)
+
+class JournalImporter:
+    """Validate entries against a preloaded chart of accounts and write them in chunks"""
+
+    def __init__(self, db: Session, company_id: int, user_id: int, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.db = db
+        self.company_id = company_id
+        self.user_id = user_id
+        self.chunk_size = max(1, chunk_size)
+        self.closed_through, self.accounts_version = db.query(
+            Company.closed_through, Company.accounts_version
+        ).filter(Company.id == company_id).one()
+        self._load_accounts()
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+
+    def _load_accounts(self):
+        self.account_ids: Set[int] = set()
+        self.account_codes: Dict[str, int] = {}
+        for account_id, code in self.db.query(Account.id, Account.code).filter(Account.company_id == self.company_id):
+            self.account_ids.add(account_id)
+            self.account_codes[code] = account_id
+
+    def _error(self, row: int, message: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "error": message})
+
+    def validate(self, data: dict) -> JournalEntryCreate:
+        """Build a JournalEntryCreate for this company, resolving account codes"""
+        for line in data.get("lines") or []:
+            if isinstance(line, dict) and not line.get("account_id") and line.get("account_code"):
+                code = line.pop("account_code")
+                if code not in self.account_codes:
+                    raise ImportRowError(f"Unknown account code {code}")
+                line["account_id"] = self.account_codes[code]
+            elif isinstance(line, dict):
+                line.pop("account_code", None)
+
+        data["company_id"] = self.company_id
+        entry = JournalEntryCreate(**data)
+
+        if self.closed_through is not None and entry.date <= self.closed_through:
+            raise ImportRowError(f"Period is closed through {self.closed_through.isoformat()}")
+
+        unknown = {line.account_id for line in entry.lines} - self.account_ids
+        if unknown:
+            raise ImportRowError(
+                f"Accounts not found or don't belong to this company: {', '.join(str(i) for i in sorted(unknown))}"
+            )
+        return entry
+
+    def _write_chunk(self, chunk: List[Tuple[int, JournalEntryCreate]]):
+        """Post (row_number, entry) pairs in one transaction, under the same company lock and period check as a posting"""
+        company = begin_posting(self.db, self.company_id)
+        if company is None:
+            self.db.rollback()
+            for row_number, _ in chunk:
+                self._error(row_number, "Company not found")
+            return
+        # The period may have been closed, or accounts moved away, since the chunk was validated
+        self.closed_through = company.closed_through
+        if company.accounts_version != self.accounts_version:
+            self.accounts_version = company.accounts_version
+            self._load_accounts()
+        valid = []
+        for row_number, entry in chunk:
+            if self.closed_through is not None and entry.date <= self.closed_through:
+                self._error(row_number, f"Period is closed through {self.closed_through.isoformat()}")
+            elif any(line.account_id not in self.account_ids for line in entry.lines):
+                self._error(row_number, "Accounts not found or don't belong to this company")
+            else:
+                valid.append((row_number, entry))
+        chunk = valid
+        if not chunk:
+            self.db.rollback()
+            return
+
+        entries = [
+            {
+                "company_id": self.company_id,
+                "date": entry.date,
+                "description": entry.description,
+                "reference": entry.reference,
+                "created_by": self.user_id
+            }
+            for _, entry in chunk
+        ]
+        entry_ids = returned_ids(self.db.execute(INSERT_ENTRIES, entries).all(), entries)
+
+        postings = [
+            (entry.date, [
+                {
+                    "entry_id": entry_id,
+                    "company_id": self.company_id,
+                    "entry_date": entry.date,
+                    "account_id": line.account_id,
+                    # Rounded to cents as Numeric(15, 2) stores them, so the snapshot and amount_minor agree
+                    "debit": from_minor(to_minor(line.debit)),
+                    "credit": from_minor(to_minor(line.credit)),
+                    "amount_minor": line_minor(line.debit, line.credit),
+                    "description": line.description
+                }
+                for line in entry.lines
+            ])
+            for entry_id, (_, entry) in zip(entry_ids, chunk)
+        ]
+        self.db.execute(insert(JournalLine), [line for _, lines in postings for line in lines])
+        record_period_activity_many(self.db, self.company_id, postings)
+        # Goes out with the commit below, and not at all if it rolls back
+        publish_ledger_event(self.db, entries_imported_event(self.company_id, company.ledger_version, postings))
+        self.db.commit()
+        self.imported += len(chunk)
+        invalidate_company(self.company_id)
+        ledger_cache.append_many(self.company_id, company.ledger_version, postings)
+
+    def run(self, rows: Iterable[Tuple[int, Optional[dict], Optional[str]]]) -> dict:
+        """Consume parsed rows, committing every chunk_size valid entries"""
+        chunk: List[Tuple[int, JournalEntryCreate]] = []
+        for row_number, data, error in rows:
+            if error:
+                self._error(row_number, error)
+                continue
+            try:
+                chunk.append((row_number, self.validate(data)))
+            except ValidationError as e:
+                self._error(row_number, _format_validation_error(e))
+                continue
+            except (ImportRowError, TypeError, ValueError) as e:
+                self._error(row_number, str(e))
+                continue
+
+            if len(chunk) >= self.chunk_size:
+                self._write_chunk(chunk)
+                chunk = []
+
+        if chunk:
+            self._write_chunk(chunk)
+
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors
+        }
+
+def import_journal(
+    db: Session,
+    company_id: int,
+    user_id: int,
+    stream: TextIO,
+    file_format: str = "ndjson",
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> dict:
+    """Import NDJSON or CSV journal entries for a company and return a per-row error report"""
+    rows = iter_csv(stream) if file_format == "csv" else iter_ndjson(stream)
+    return JournalImporter(db, company_id, user_id, chunk_size).run(rows)
@@ -0,0 +1,293 @@
+import threading
+from collections import OrderedDict
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import BigInteger, cast, func, select
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..models import Account, Company, JournalLine
+from ..models.account import AccountType
+from .amounts import from_minor
+from .balances import closing_entry_ids, get_account_balances
+
+# dtypes of the account, day, amount and closing columns
+COLUMN_DTYPES = (np.int32, np.int32, np.int64, np.bool_)
+BYTES_PER_LINE = sum(np.dtype(dtype).itemsize for dtype in COLUMN_DTYPES)
+# Appended lines kept unsorted before they are merged into the sorted columns
+TAIL_LIMIT = 8192
+# Rows fetched per round trip while loading a ledger
+LOAD_BATCH_SIZE = 10_000
+
+class CompanyLedger:
+    """One company's journal lines as columns sorted by entry date, plus an unsorted tail of recent postings.
+
+    account holds positions into account_ids (every account of the company, with
+    its type in account_types), day the date ordinal and amount the signed cents
+    (debit - credit); closing marks lines of fiscal year closing entries. Postings
+    are appended to the tail (account, day, amount; never closing), which is
+    merged into the sorted columns once it passes TAIL_LIMIT, so an append costs
+    the size of the tail rather than of the ledger. The columns and tail are
+    swapped as one tuple, never modified in place, so readers can use them
+    unlocked. Account changes bump the ledger version, so the accounts are fixed
+    for the ledger's lifetime.
+    """
+
+    def __init__(self, version: int, account_ids: List[int], account_types: List[Optional[AccountType]], account, day, amount, closing):
+        self.version = version
+        self.account_ids = account_ids
+        self.account_types = account_types
+        self.position = {account_id: i for i, account_id in enumerate(account_ids)}
+        account_dtype, day_dtype, amount_dtype, _ = COLUMN_DTYPES
+        self.data = (
+            (account, day, amount, closing),
+            (np.empty(0, dtype=account_dtype), np.empty(0, dtype=day_dtype), np.empty(0, dtype=amount_dtype))
+        )
+        # Serializes tail swaps; merging holds _merging so only one thread does the work
+        self._lock = threading.Lock()
+        self._merging = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        columns, tail = self.data
+        return sum(column.nbytes for column in columns + tail)
+
+    @property
+    def needs_merge(self) -> bool:
+        return len(self.data[1][0]) > TAIL_LIMIT
+
+    def append(self, version: int, postings: List[Tuple[date, List[dict]]]) -> None:
+        """Add posted (entry_date, lines) entries, lines as {account_id, amount_minor}, to the tail in posting order"""
+        account_dtype, day_dtype, amount_dtype, _ = COLUMN_DTYPES
+        account = np.array([self.position[line["account_id"]] for _, lines in postings for line in lines], dtype=account_dtype)
+        day = np.array([entry_date.toordinal() for entry_date, lines in postings for _ in lines], dtype=day_dtype)
+        amount = np.array([line["amount_minor"] for _, lines in postings for line in lines], dtype=amount_dtype)
+        with self._lock:
+            columns, (tail_account, tail_day, tail_amount) = self.data
+            self.data = (columns, (
+                np.concatenate((tail_account, account)),
+                np.concatenate((tail_day, day)),
+                np.concatenate((tail_amount, amount))
+            ))
+            self.version = version
+
+    def merge(self) -> None:
+        """Fold the tail into the sorted columns; a thread finding a merge under way leaves it to that one"""
+        if not self._merging.acquire(blocking=False):
+            return
+        try:
+            (account, day, amount, closing), tail = self.data
+            merged = len(tail[0])
+            if not merged:
+                return
+            tail_account, tail_day, tail_amount = tail
+            # After any lines already on the same date, keeping posting order within a day
+            order = np.argsort(tail_day, kind="stable")
+            at = np.searchsorted(day, tail_day[order], side="right")
+            columns = (
+                np.insert(account, at, tail_account[order]),
+                np.insert(day, at, tail_day[order]),
+                np.insert(amount, at, tail_amount[order]),
+                np.insert(closing, at, np.zeros(merged, dtype=bool))
+            )
+            with self._lock:
+                # Keep whatever was appended while merging
+                self.data = (columns, tuple(column[merged:] for column in self.data[1]))
+        finally:
+            self._merging.release()
+
+    def balances(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        account_types: Optional[Iterable[AccountType]] = None,
+        exclude_closing: bool = False
+    ) -> Dict[int, Decimal]:
+        """{account_id: debit - credit} over a date range, like get_account_balances"""
+        if self.needs_merge:
+            self.merge()
+        (account, day, amount, closing), (tail_account, tail_day, tail_amount) = self.data
+        lo = 0 if start_date is None else int(np.searchsorted(day, start_date.toordinal(), side="left"))
+        hi = len(day) if end_date is None else int(np.searchsorted(day, end_date.toordinal(), side="right"))
+        account, amount = account[lo:hi], amount[lo:hi]
+        if exclude_closing:
+            keep = ~closing[lo:hi]
+            account, amount = account[keep], amount[keep]
+        if len(tail_day):
+            keep = np.ones(len(tail_day), dtype=bool)
+            if start_date is not None:
+                keep &= tail_day >= start_date.toordinal()
+            if end_date is not None:
+                keep &= tail_day <= end_date.toordinal()
+            account = np.concatenate((account, tail_account[keep]))
+            amount = np.concatenate((amount, tail_amount[keep]))
+
+        size = len(self.account_ids)
+        counts = np.bincount(account, minlength=size)
+        # float64 sums of whole cents are exact below 2**53 cents per account
+        totals = np.rint(np.bincount(account, weights=amount, minlength=size)).astype(np.int64)
+        if account_types is not None:
+            wanted = set(account_types)
+            counts = counts * np.fromiter((t in wanted for t in self.account_types), dtype=bool, count=size)
+        return {
+            self.account_ids[i]: from_minor(int(totals[i]))
+            for i in np.flatnonzero(counts)
+        }
+
+class LedgerCache:
+    """LRU of CompanyLedger columns per company, bounded by their total size in bytes.
+
+    A ledger is valid for one Company.ledger_version: postings and imports in
+    this process append to it, while any other change (imports, closes, account moves, postings
+    by other workers) bumps the version past it and it is reloaded on next use.
+    Companies too large to cache are remembered per version, so their reports go
+    straight to SQL instead of loading and discarding the ledger every time.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._ledgers: "OrderedDict[int, CompanyLedger]" = OrderedDict()
+        # company_id -> the ledger_version at which its lines did not fit
+        self._oversized: Dict[int, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return sum(ledger.nbytes for ledger in self._ledgers.values())
+
+    def get(self, db: Session, company: Company) -> Optional[CompanyLedger]:
+        """The company's ledger at its current version, loading it on first use; None if it will not fit"""
+        if not self.enabled:
+            return None
+        version = company.ledger_version or 0
+        with self._lock:
+            ledger = self._ledgers.get(company.id)
+            if ledger is not None and ledger.version == version:
+                self._ledgers.move_to_end(company.id)
+                return ledger
+            if self._oversized.get(company.id) == version:
+                return None
+
+        # A posting committed while loading may or may not be in what was read, so
+        # the load only counts if the version did not move; one retry covers the usual race
+        for _ in range(2):
+            count = db.query(func.count(JournalLine.id)).filter(JournalLine.company_id == company.id).scalar()
+            if count * BYTES_PER_LINE > self.max_bytes:
+                with self._lock:
+                    self._oversized[company.id] = version
+                return None
+            ledger = load_company_ledger(db, company.id, version, count)
+            current = db.query(Company.ledger_version).filter(Company.id == company.id).scalar() or 0
+            if current == version:
+                self._store(company.id, ledger)
+                return ledger
+            version = current
+        return None
+
+    def append(self, company_id: int, version: int, entry_date: date, lines: Iterable[dict]) -> None:
+        """Apply a committed posting that advanced the ledger to version; a gap drops the ledger instead"""
+        self.append_many(company_id, version, [(entry_date, list(lines))])
+
+    def append_many(self, company_id: int, version: int, postings: List[Tuple[date, List[dict]]]) -> None:
+        """Apply committed (entry_date, lines) postings that together advanced the ledger to version, as an import chunk does"""
+        with self._lock:
+            ledger = self._ledgers.get(company_id)
+            if ledger is None:
+                return
+            if ledger.version != version - 1 or any(
+                line["account_id"] not in ledger.position for _, lines in postings for line in lines
+            ):
+                del self._ledgers[company_id]
+                return
+            ledger.append(version, postings)
+            self._evict()
+        # Outside the cache lock, which other companies' reports need
+        if ledger.needs_merge:
+            ledger.merge()
+
+    def invalidate(self, company_id: int) -> None:
+        with self._lock:
+            self._ledgers.pop(company_id, None)
+            self._oversized.pop(company_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ledgers.clear()
+            self._oversized.clear()
+
+    def _store(self, company_id: int, ledger: CompanyLedger) -> None:
+        with self._lock:
+            self._ledgers[company_id] = ledger
+            self._ledgers.move_to_end(company_id)
+            self._evict()
+
+    def _evict(self) -> None:
+        total = sum(ledger.nbytes for ledger in self._ledgers.values())
+        while total > self.max_bytes and self._ledgers:
+            _, ledger = self._ledgers.popitem(last=False)
+            total -= ledger.nbytes
+
+def load_company_ledger(db: Session, company_id: int, version: int, expected_lines: int = 0) -> CompanyLedger:
+    """Read a company's journal lines into columns, in one ordered scan streamed in batches.
+
+    The columns are preallocated for expected_lines (the caller's COUNT) and grown
+    if postings committed since add more, so no list of every row is built.
+    """
+    closing_ids = set(db.execute(closing_entry_ids([company_id])).scalars())
+    types = dict(db.execute(
+        select(Account.id, Account.type).where(Account.company_id == company_id).order_by(Account.id)
+    ).all())
+    position = {account_id: i for i, account_id in enumerate(types)}
+
+    amount_minor = func.coalesce(
+        JournalLine.amount_minor,
+        cast(func.round((JournalLine.debit - JournalLine.credit) * 100), BigInteger)
+    )
+    result = db.execute(
+        select(JournalLine.account_id, JournalLine.entry_date, amount_minor, JournalLine.entry_id)
+        .where(JournalLine.company_id == company_id)
+        .order_by(JournalLine.entry_date, JournalLine.id)
+        .execution_options(yield_per=LOAD_BATCH_SIZE)
+    )
+    columns = [np.empty(max(expected_lines, 0), dtype=dtype) for dtype in COLUMN_DTYPES]
+    count = 0
+    for rows in result.partitions():
+        if count + len(rows) > len(columns[0]):
+            columns = [np.resize(column, max(2 * len(column), count + len(rows))) for column in columns]
+        for row in rows:
+            # Lines of accounts since moved to another company still count, but under no type, as in SQL
+            if row[0] not in position:
+                position[row[0]] = len(position)
+                types[row[0]] = None
+        account, day, amount, closing = (column[count:count + len(rows)] for column in columns)
+        account[:] = [position[row[0]] for row in rows]
+        day[:] = [row[1].toordinal() for row in rows]
+        amount[:] = [int(row[2]) for row in rows]
+        closing[:] = [row[3] in closing_ids for row in rows]
+        count += len(rows)
+
+    columns = [column if len(column) == count else column[:count].copy() for column in columns]
+    return CompanyLedger(version, list(types), list(types.values()), *columns)
+
+ledger_cache = LedgerCache(settings.LEDGER_CACHE_MAX_BYTES)
+
+def report_balances(
+    db: Session,
+    company: Company,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    account_types: Optional[Iterable[AccountType]] = None,
+    exclude_closing: bool = False
+) -> Dict[int, Decimal]:
+    """get_account_balances for a report, answered from the in-memory ledger when it is enabled"""
+    ledger = ledger_cache.get(db, company)
+    if ledger is None:
+        return get_account_balances(db, company.id, start_date, end_date, account_types, exclude_closing)
+
+    return ledger.balances(start_date, end_date, account_types, exclude_closing)
@@ -0,0 +1,250 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from ..config import settings
+from .amounts import from_minor, line_minor
+from .responses import dumps
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "ledger_events"
+# Session.info key for local events waiting on their transaction's commit
+PENDING_EVENTS = "pending_ledger_events"
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_NOTIFY_BYTES = 7900
+# Events buffered per client before it is told to resync instead
+SUBSCRIBER_QUEUE_SIZE = 256
+# Comment lines keep idle streams open through proxies and reveal disconnected clients
+HEARTBEAT_SECONDS = 15
+
+def entry_posted_event(row: dict, ledger_version: int) -> dict:
+    """Compact event for a committed posting: its accounts and their net debit - credit change"""
+    deltas: Dict[int, int] = {}
+    for line in row["lines"]:
+        deltas[line["account_id"]] = deltas.get(line["account_id"], 0) + line_minor(line["debit"], line["credit"])
+    return {
+        "type": "entry_posted",
+        "company_id": row["company_id"],
+        "entry_id": row["id"],
+        "date": row["date"],
+        "ledger_version": ledger_version,
+        "accounts": [
+            {"account_id": account_id, "delta": from_minor(delta)}
+            for account_id, delta in deltas.items()
+        ]
+    }
+
+def entries_imported_event(company_id: int, ledger_version: int, postings) -> dict:
+    """Compact event for a committed import chunk of (entry_date, lines) postings, with net changes per account"""
+    deltas: Dict[int, int] = {}
+    for _, lines in postings:
+        for line in lines:
+            deltas[line["account_id"]] = deltas.get(line["account_id"], 0) + line["amount_minor"]
+    return {
+        "type": "entries_imported",
+        "company_id": company_id,
+        "entries": len(postings),
+        "ledger_version": ledger_version,
+        "accounts": [
+            {"account_id": account_id, "delta": from_minor(delta)}
+            for account_id, delta in deltas.items()
+        ]
+    }
+
+class Subscriber:
+    """One client's event queue, fed from any thread and read on its event loop"""
+
+    def __init__(self, company_id: int):
+        self.company_id = company_id
+        self.loop = asyncio.get_running_loop()
+        # (event type, encoded event) pairs
+        self.queue: "asyncio.Queue[Tuple[str, bytes]]" = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        # Set when events were dropped; the client must refetch instead of applying deltas
+        self.overflowed = False
+
+    def _deliver(self, event_type: str, payload: bytes) -> None:
+        if self.queue.full():
+            self.overflowed = True
+        else:
+            self.queue.put_nowait((event_type, payload))
+
+class LedgerEventBroker:
+    """In-process fan-out of ledger events to the subscribers of each company"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[int, Set[Subscriber]] = defaultdict(set)
+
+    def subscribe(self, company_id: int) -> Subscriber:
+        """Register a client; call from the event loop that will read its queue"""
+        subscriber = Subscriber(company_id)
+        with self._lock:
+            self._subscribers[company_id].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.company_id)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[subscriber.company_id]
+
+    def dispatch(self, company_id: int, event_type: str, payload: bytes) -> None:
+        """Hand an encoded event to every subscriber of the company; safe from any thread"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(company_id, ()))
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber._deliver, event_type, payload)
+            except RuntimeError:
+                # Its event loop has closed
+                self.unsubscribe(subscriber)
+
+class LocalBackend:
+    """Delivers events only to clients connected to this process, once the posting's transaction commits"""
+
+    def __init__(self, broker: LedgerEventBroker):
+        self.broker = broker
+
+    def publish(self, db: Session, company_id: int, event_type: str, payload: bytes) -> None:
+        db.info.setdefault(PENDING_EVENTS, []).append((company_id, event_type, payload))
+
+    def start(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+class PostgresBackend:
+    """Fans events out across processes with NOTIFY/LISTEN on the application database.
+
+    Events are sent with pg_notify on the posting's own transaction, so they are
+    delivered only if it commits and cost no extra connection. Every process,
+    including the publisher, receives its own notifications through one listening
+    connection, opened when the first client subscribes.
+    """
+
+    def __init__(self, broker: LedgerEventBroker, engine):
+        self.broker = broker
+        self.engine = engine
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def publish(self, db: Session, company_id: int, event_type: str, payload: bytes) -> None:
+        if len(payload) > MAX_NOTIFY_BYTES:
+            event = json.loads(payload)
+            # Too many accounts for one notification; clients refetch rather than apply deltas
+            payload = dumps({**{k: v for k, v in event.items() if k != "accounts"}, "truncated": True})
+        db.execute(text("SELECT pg_notify(:channel, :payload)"), {
+            "channel": CHANNEL,
+            "payload": payload.decode()
+        })
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._listen, name="ledger-events", daemon=True)
+                self._thread.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+
+    def _listen(self) -> None:
+        while not self._stop.is_set():
+            try:
+                # Taken out of the pool for good, so it can sit in LISTEN
+                fairy = self.engine.raw_connection()
+                fairy.detach()
+                connection = fairy.dbapi_connection
+                connection.autocommit = True
+                try:
+                    connection.cursor().execute(f"LISTEN {CHANNEL}")
+                    while not self._stop.is_set():
+                        if select.select([connection], [], [], 1.0)[0]:
+                            connection.poll()
+                            while connection.notifies:
+                                notify = connection.notifies.pop(0)
+                                self._dispatch(notify.payload)
+                finally:
+                    connection.close()
+            except Exception:
+                # Reconnect after a dropped connection; clients see the events missed meanwhile as a ledger_version gap
+                self._stop.wait(5.0)
+
+    def _dispatch(self, payload: str) -> None:
+        event = json.loads(payload)
+        self.broker.dispatch(event["company_id"], event["type"], payload.encode())
+
+def _create_backend(broker: LedgerEventBroker):
+    if settings.LEDGER_EVENTS_BACKEND == "postgres":
+        from ..database import engine
+        if engine.dialect.name != "postgresql":
+            raise RuntimeError("LEDGER_EVENTS_BACKEND=postgres requires a PostgreSQL DATABASE_URL")
+        return PostgresBackend(broker, engine)
+    return LocalBackend(broker)
+
+ledger_event_broker = LedgerEventBroker()
+ledger_event_backend = _create_backend(ledger_event_broker)
+
+def publish_ledger_event(db: Session, ledger_event: dict) -> None:
+    """Send an event to the company's subscribers in every process when db's transaction commits.
+
+    Call it before the commit; a rollback drops the event along with the change.
+    """
+    ledger_event_backend.publish(db, ledger_event["company_id"], ledger_event["type"], dumps(ledger_event))
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_pending_events(session: Session) -> None:
+    for company_id, event_type, payload in session.info.pop(PENDING_EVENTS, ()):
+        try:
+            ledger_event_broker.dispatch(company_id, event_type, payload)
+        except Exception:
+            # The change is already committed; subscribers notice the gap in ledger_version
+            logger.exception("Dispatching ledger event failed")
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending_events(session: Session) -> None:
+    session.info.pop(PENDING_EVENTS, None)
+
+def _sse(event: str, data: bytes) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+async def stream_ledger_events(company_id: int, ledger_version: int) -> AsyncIterator[bytes]:
+    """Server-sent events for one client: ready, then entry_posted per posting and entries_imported per import chunk, resync if it falls behind.
+
+    ready carries the ledger_version the client is starting from; any later event
+    whose ledger_version is not one more than the last seen means something else
+    changed the ledger (a close, an account change, a lost event) and reports should be refetched.
+    """
+    subscriber = ledger_event_broker.subscribe(company_id)
+    ledger_event_backend.start()
+    try:
+        yield b"retry: 3000\n" + _sse("ready", dumps({"company_id": company_id, "ledger_version": ledger_version}))
+        while True:
+            try:
+                event_type, payload = await asyncio.wait_for(subscriber.queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if subscriber.overflowed:
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                subscriber.overflowed = False
+                yield _sse("resync", dumps({"company_id": company_id}))
+                continue
+            yield _sse(event_type, payload)
+    finally:
+        ledger_event_broker.unsubscribe(subscriber)
@@ -0,0 +1,20 @@
+import base64
+import json
+from datetime import date
+from typing import Tuple
+from fastapi import HTTPException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(entry_date: date, entry_id: int) -> str:
+    """Opaque keyset cursor for a (date, id) position"""
+    raw = json.dumps([entry_date.isoformat(), entry_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        entry_date, entry_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return date.fromisoformat(entry_date), int(entry_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
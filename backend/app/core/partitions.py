@@ -0,0 +1,157 @@
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Set
+from sqlalchemy import func, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import AddConstraint, CreateIndex
+from ..models import Company, JournalLine
+from .periods import Period, add_months, fiscal_year_containing
+
+PARENT = "journal_lines"
+UNPARTITIONED = "journal_lines_unpartitioned"
+DEFAULT_PARTITION = "journal_lines_default"
+
+def company_partition_name(company_id: int) -> str:
+    return f"{PARENT}_c{company_id}"
+
+def year_partition_name(company_id: int, start: date) -> str:
+    return f"{PARENT}_c{company_id}_{start:%Y%m%d}"
+
+def fiscal_years(first: date, last: date, fiscal_year_start: date) -> List[Period]:
+    """Every fiscal year from the one containing first through the one containing last"""
+    years = [fiscal_year_containing(first, fiscal_year_start)]
+    while years[-1].end < last:
+        years.append(fiscal_year_containing(years[-1].end + timedelta(days=1), fiscal_year_start))
+    return years
+
+def _move_and_attach(table: str, parent: str, source: str, condition: str, bound: str) -> List[str]:
+    """Create table shaped like the ledger, move matching rows out of source, then attach it.
+
+    Rows already sitting in a default partition would make a plain
+    CREATE ... PARTITION OF fail, so the partition is filled first and attached after.
+    """
+    return [
+        f"CREATE TABLE {table} (LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+        f"WITH moved AS (DELETE FROM {source} WHERE {condition} RETURNING *) INSERT INTO {table} SELECT * FROM moved",
+        f"ALTER TABLE {parent} ATTACH PARTITION {table} {bound}",
+    ]
+
+def company_partition_statements(company_id: int) -> List[str]:
+    """List partition for one company, sub-partitioned by entry date with its own default"""
+    table = company_partition_name(company_id)
+    return [
+        f"CREATE TABLE {table} (LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) PARTITION BY RANGE (entry_date)",
+        f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT",
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE company_id = {int(company_id)} RETURNING *) "
+        f"INSERT INTO {table} SELECT * FROM moved",
+        f"ALTER TABLE {PARENT} ATTACH PARTITION {table} FOR VALUES IN ({int(company_id)})",
+    ]
+
+def year_partition_statements(company_id: int, year: Period) -> List[str]:
+    """Range partition holding one fiscal year of a company's lines"""
+    end = year.end + timedelta(days=1)
+    return _move_and_attach(
+        year_partition_name(company_id, year.start),
+        company_partition_name(company_id),
+        f"{company_partition_name(company_id)}_default",
+        f"entry_date >= '{year.start.isoformat()}' AND entry_date < '{end.isoformat()}'",
+        f"FOR VALUES FROM ('{year.start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+def conversion_statements(sequence: str) -> List[str]:
+    """Swap the plain table for an empty parent partitioned by company, keeping the id sequence"""
+    return [
+        f"ALTER TABLE {PARENT} RENAME TO {UNPARTITIONED}",
+        f"CREATE TABLE {PARENT} (LIKE {UNPARTITIONED} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        f"PARTITION BY LIST (company_id)",
+        f"ALTER SEQUENCE {sequence} OWNED BY {PARENT}.id",
+        f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {PARENT} DEFAULT",
+    ]
+
+def finish_conversion_statements() -> List[str]:
+    """Copy rows into the partitions, then recreate keys and indexes on the parent.
+
+    Unique constraints on a partitioned table must contain the partition keys,
+    so the primary key becomes (id, company_id, entry_date); ids still come from
+    the one sequence. Foreign keys and indexes are taken from the model.
+    """
+    dialect = postgresql.dialect()
+    table = JournalLine.__table__
+    statements = [
+        f"INSERT INTO {PARENT} SELECT * FROM {UNPARTITIONED}",
+        f"DROP TABLE {UNPARTITIONED}",
+        f"ALTER TABLE {PARENT} ADD PRIMARY KEY (id, company_id, entry_date)",
+    ]
+    statements.extend(
+        str(AddConstraint(constraint).compile(dialect=dialect))
+        for constraint in sorted(table.foreign_key_constraints, key=lambda c: c.column_keys)
+    )
+    statements.extend(
+        str(CreateIndex(index).compile(dialect=dialect))
+        for index in sorted(table.indexes, key=lambda i: i.name)
+    )
+    return statements
+
+def is_partitioned(db: Session) -> bool:
+    return db.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:name))"),
+        {"name": PARENT}
+    ).scalar()
+
+def existing_partitions(db: Session) -> Set[str]:
+    """Names of every partition below journal_lines, at any level"""
+    return set(db.execute(text("""
+        WITH RECURSIVE tree(oid) AS (
+            SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(:name)
+            UNION ALL
+            SELECT pg_inherits.inhrelid FROM pg_inherits JOIN tree ON pg_inherits.inhparent = tree.oid
+        )
+        SELECT pg_class.relname FROM tree JOIN pg_class ON pg_class.oid = tree.oid
+    """), {"name": PARENT}).scalars())
+
+def plan_partitions(
+    db: Session,
+    years_ahead: int = 1,
+    company_id: Optional[int] = None,
+    today: Optional[date] = None
+) -> List[str]:
+    """SQL that partitions journal_lines (if it is not yet) and adds any missing company/year partitions.
+
+    Each company gets a partition per fiscal year from its first entry through
+    years_ahead years past the current one. Lines outside every range land in a
+    default partition, so postings never fail; run this again to split them out.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        raise ValueError("Partitioning journal_lines requires PostgreSQL")
+    today = today or date.today()
+
+    statements = []
+    partitioned = is_partitioned(db)
+    if not partitioned:
+        sequence = db.execute(text("SELECT pg_get_serial_sequence(:name, 'id')"), {"name": PARENT}).scalar()
+        statements.extend(conversion_statements(sequence))
+    existing = existing_partitions(db) if partitioned else set()
+
+    first_dates: Dict[int, date] = dict(
+        db.query(JournalLine.company_id, func.min(JournalLine.entry_date)).group_by(JournalLine.company_id).all()
+    )
+    query = db.query(Company).order_by(Company.id)
+    if company_id is not None:
+        query = query.filter(Company.id == company_id)
+    for company in query:
+        if company_partition_name(company.id) not in existing:
+            statements.extend(company_partition_statements(company.id))
+        last = add_months(fiscal_year_containing(today, company.fiscal_year_start).end, 12 * years_ahead)
+        first = min(first_dates.get(company.id, today), today)
+        for year in fiscal_years(first, last, company.fiscal_year_start):
+            if year_partition_name(company.id, year.start) not in existing:
+                statements.extend(year_partition_statements(company.id, year))
+
+    if not partitioned:
+        statements.extend(finish_conversion_statements())
+    return statements
+
+def apply_statements(db: Session, statements: List[str]) -> None:
+    """Run a plan within the caller's transaction"""
+    for statement in statements:
+        db.execute(text(statement))
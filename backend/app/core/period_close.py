@@ -0,0 +1,112 @@
+from datetime import date, timedelta
+from typing import Optional
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from ..models import Account, Company, JournalEntry, JournalLine, AccountOpeningBalance, FiscalYearClose
+from ..models.account import AccountType
+from .balances import get_account_balances, get_account_totals, record_period_activity, ZERO
+from .cache import bump_ledger_version
+from .periods import fiscal_year_containing
+
+def close_fiscal_year(
+    db: Session,
+    company: Company,
+    fiscal_year_end: date,
+    retained_earnings_account_id: int,
+    user_id: int,
+    today: Optional[date] = None
+) -> FiscalYearClose:
+    """Close the fiscal year ending on fiscal_year_end, within the caller's transaction.
+
+    Posts a closing entry that moves every revenue and expense balance into the
+    retained earnings account, writes each account's cumulative totals as opening
+    balances for the next year and locks postings on or before the year end.
+    Raises ValueError when the year cannot be closed.
+    """
+    fiscal_year = fiscal_year_containing(fiscal_year_end, company.fiscal_year_start)
+    if fiscal_year.end != fiscal_year_end:
+        raise ValueError(f"{fiscal_year_end.isoformat()} is not a fiscal year end; "
+                         f"{fiscal_year.label} ends {fiscal_year.end.isoformat()}")
+    if fiscal_year_end >= (today or date.today()):
+        raise ValueError(f"{fiscal_year.label} has not ended yet")
+    if company.closed_through is not None:
+        if fiscal_year_end <= company.closed_through:
+            raise ValueError(f"{fiscal_year.label} is already closed")
+        if fiscal_year.start != company.closed_through + timedelta(days=1):
+            raise ValueError(f"Close the fiscal year starting {(company.closed_through + timedelta(days=1)).isoformat()} first")
+
+    retained_earnings = db.query(Account).filter(
+        Account.id == retained_earnings_account_id,
+        Account.company_id == company.id
+    ).first()
+    if retained_earnings is None or retained_earnings.type != AccountType.EQUITY:
+        raise ValueError("Retained earnings must be an equity account of this company")
+
+    # Cumulative revenue and expense balances, including any earlier years never closed
+    balances = get_account_balances(
+        db, company.id, end_date=fiscal_year_end,
+        account_types=[AccountType.REVENUE, AccountType.EXPENSE]
+    )
+    lines = []
+    net = ZERO
+    for account_id, balance in sorted(balances.items()):
+        if balance == 0:
+            continue
+        net += balance
+        lines.append({
+            "account_id": account_id,
+            "debit": -balance if balance < 0 else ZERO,
+            "credit": balance if balance > 0 else ZERO,
+            "description": "Close to retained earnings"
+        })
+    if net != 0:
+        lines.append({
+            "account_id": retained_earnings.id,
+            "debit": net if net > 0 else ZERO,
+            "credit": -net if net < 0 else ZERO,
+            "description": f"{fiscal_year.label} net income" if net < 0 else f"{fiscal_year.label} net loss"
+        })
+
+    closing_entry = None
+    if lines:
+        closing_entry = JournalEntry(
+            company_id=company.id,
+            date=fiscal_year_end,
+            description=f"Closing entry {fiscal_year.label}",
+            reference=f"CLOSE-{fiscal_year.label}",
+            created_by=user_id,
+            is_closing=True,
+            lines=[JournalLine(**line) for line in lines]
+        )
+        db.add(closing_entry)
+        db.flush()
+        record_period_activity(db, company.id, fiscal_year_end, lines)
+
+    # Carry cumulative totals (now with revenue and expenses at zero) into the next year
+    next_year_start = fiscal_year_end + timedelta(days=1)
+    opening = [
+        {
+            "company_id": company.id,
+            "account_id": account_id,
+            "period_start": next_year_start,
+            "debit": debit,
+            "credit": credit
+        }
+        for account_id, (debit, credit) in get_account_totals(db, company.id, end_date=fiscal_year_end).items()
+        if debit != credit
+    ]
+    if opening:
+        db.execute(insert(AccountOpeningBalance), opening)
+
+    close = FiscalYearClose(
+        company_id=company.id,
+        start_date=fiscal_year.start,
+        end_date=fiscal_year_end,
+        retained_earnings_account_id=retained_earnings.id,
+        closing_entry_id=closing_entry.id if closing_entry is not None else None,
+        closed_by=user_id
+    )
+    db.add(close)
+    company.closed_through = fiscal_year_end
+    bump_ledger_version(db, company.id)
+    return close
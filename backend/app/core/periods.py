@@ -0,0 +1,98 @@
+import calendar
+from datetime import date, timedelta
+from typing import List, NamedTuple
+
+GRAIN_MONTHS = {"month": 1, "quarter": 3, "year": 12}
+MAX_PERIODS = 120
+SERIES_GRAINS = ("day", "week", "month")
+MAX_SERIES_POINTS = 1000
+
+class Period(NamedTuple):
+    label: str
+    start: date
+    end: date
+
+def add_months(value: date, months: int) -> date:
+    month_index = value.month - 1 + months
+    year = value.year + month_index // 12
+    month = month_index % 12 + 1
+    return date(year, month, min(value.day, calendar.monthrange(year, month)[1]))
+
+def fiscal_year_start_on_or_before(value: date, fiscal_year_start: date) -> date:
+    """Latest fiscal year start on or before value"""
+    fy_start = date(value.year, fiscal_year_start.month, min(fiscal_year_start.day, 28))
+    while fy_start > value:
+        fy_start = add_months(fy_start, -12)
+    return fy_start
+
+def fiscal_year_containing(value: date, fiscal_year_start: date) -> Period:
+    """The full fiscal year that value falls in, labelled like build_periods"""
+    start = fiscal_year_start_on_or_before(value, fiscal_year_start)
+    end = add_months(start, 12) - timedelta(days=1)
+    return Period(f"FY{end.year}", start, end)
+
+def build_periods(start_date: date, end_date: date, grain: str, fiscal_year_start: date) -> List[Period]:
+    """Split [start_date, end_date] into month/quarter/year buckets aligned to the fiscal year.
+
+    Quarters and years begin on the anniversary of fiscal_year_start; months begin on its
+    day of month. The first and last buckets are clipped to the requested range. Fiscal
+    years are labelled by the calendar year they end in.
+    """
+    if grain not in GRAIN_MONTHS:
+        raise ValueError("grain must be one of: month, quarter, year")
+    if end_date < start_date:
+        raise ValueError("end_date must not be before start_date")
+    step = GRAIN_MONTHS[grain]
+
+    fy_start = fiscal_year_start_on_or_before(start_date, fiscal_year_start)
+
+    # Walk forward from the fiscal year start to the bucket containing start_date
+    bucket_index = 0
+    while add_months(fy_start, (bucket_index + 1) * step) <= start_date:
+        bucket_index += 1
+    bucket_start = add_months(fy_start, bucket_index * step)
+
+    periods = []
+    while bucket_start <= end_date:
+        bucket_end = add_months(fy_start, (bucket_index + 1) * step) - timedelta(days=1)
+        fiscal_year = (add_months(fy_start, 12 * (bucket_index * step // 12 + 1)) - timedelta(days=1)).year
+        if grain == "month":
+            label = bucket_start.strftime("%Y-%m")
+        elif grain == "quarter":
+            label = f"FY{fiscal_year} Q{bucket_index % 4 + 1}"
+        else:
+            label = f"FY{fiscal_year}"
+        periods.append(Period(label, max(bucket_start, start_date), min(bucket_end, end_date)))
+        if len(periods) > MAX_PERIODS:
+            raise ValueError(f"Range covers more than {MAX_PERIODS} periods")
+        bucket_index += 1
+        bucket_start = add_months(fy_start, bucket_index * step)
+    return periods
+
+def build_series_dates(start_date: date, end_date: date, grain: str, fiscal_year_start: date) -> List[date]:
+    """Dates a balance series is sampled on: every day, every Sunday, or every fiscal month end.
+
+    end_date is always the last point, so a partial final week or month still shows
+    the latest balance.
+    """
+    if grain not in SERIES_GRAINS:
+        raise ValueError("grain must be one of: day, week, month")
+    if end_date < start_date:
+        raise ValueError("end_date must not be before start_date")
+
+    if grain == "day":
+        count = (end_date - start_date).days + 1
+        if count > MAX_SERIES_POINTS:
+            raise ValueError(f"Range covers more than {MAX_SERIES_POINTS} points")
+        return [start_date + timedelta(days=offset) for offset in range(count)]
+    if grain == "week":
+        dates = []
+        point = start_date + timedelta(days=6 - start_date.weekday())
+        while point < end_date:
+            dates.append(point)
+            point += timedelta(days=7)
+        dates.append(end_date)
+        if len(dates) > MAX_SERIES_POINTS:
+            raise ValueError(f"Range covers more than {MAX_SERIES_POINTS} points")
+        return dates
+    return [period.end for period in build_periods(start_date, end_date, grain, fiscal_year_start)]
@@ -0,0 +1,104 @@
+from sqlalchemy import insert, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from typing import List, Optional, Sequence
+from ..models import Company, JournalEntry, JournalLine
+from ..schemas import JournalEntryCreate
+from .amounts import from_minor, to_minor
+from .balances import record_period_activity
+
+# Core statements on the tables skip the ORM bulk-insert machinery and are compiled once
+INSERT_ENTRY = insert(JournalEntry.__table__).returning(JournalEntry.id, JournalEntry.created_at)
+# Unordered RETURNING batches on every dialect; ids are matched back on the other returned columns
+INSERT_LINES = insert(JournalLine.__table__).returning(
+    JournalLine.id, JournalLine.account_id, JournalLine.debit, JournalLine.credit, JournalLine.description
+)
+BUMP_COMPANY = (
+    update(Company.__table__)
+    .values(ledger_version=Company.ledger_version + 1)
+    .returning(Company.id, Company.closed_through, Company.ledger_version, Company.accounts_version)
+)
+
+def returned_ids(rows: Sequence[Row], params: Sequence[dict]) -> List[int]:
+    """Map the ids of an unordered multi-row INSERT ... RETURNING id, <columns> back onto its parameter dicts.
+
+    Ordered RETURNING (sort_by_parameter_order) has no implicit sentinel on
+    SQLite and degrades to one INSERT per row, so rows are matched on the
+    returned columns instead; rows that match are identical and their ids
+    interchangeable.
+    """
+    if not rows:
+        return []
+    ids = {}
+    for row in rows:
+        ids.setdefault(tuple(row[1:]), []).append(row[0])
+    columns = rows[0]._fields[1:]
+    return [ids[tuple(values[column] for column in columns)].pop() for values in params]
+
+def begin_posting(db: Session, company_id: int) -> Optional[Row]:
+    """Bump a company's ledger version, returning its (id, closed_through, ledger_version, accounts_version) or None if it does not exist.
+
+    The one UPDATE doubles as the existence check and holds the company row
+    lock for the rest of the transaction, serializing postings per company.
+    """
+    return db.execute(BUMP_COMPANY.where(Company.id == company_id)).first()
+
+def post_journal_entry(db: Session, entry: JournalEntryCreate, user_id: int) -> dict:
+    """Insert an entry and its lines within the caller's transaction, returning it as a response row.
+
+    The entry and all of its lines are written with one INSERT ... RETURNING each,
+    and the row is built from what was sent plus the returned ids, so no reload
+    is needed after the commit. Call begin_posting first; accounts and the period
+    lock are the caller's to check.
+    """
+    entry_id, created_at = db.execute(
+        INSERT_ENTRY,
+        {
+            "company_id": entry.company_id,
+            "date": entry.date,
+            "description": entry.description,
+            "reference": entry.reference,
+            "created_by": user_id,
+            "is_closing": False
+        }
+    ).one()
+
+    lines = [
+        {
+            "entry_id": entry_id,
+            "company_id": entry.company_id,
+            "entry_date": entry.date,
+            "account_id": line.account_id,
+            # Rounded to cents as Numeric(15, 2) stores them
+            "debit": from_minor(to_minor(line.debit)),
+            "credit": from_minor(to_minor(line.credit)),
+            "amount_minor": to_minor(line.debit) - to_minor(line.credit),
+            "description": line.description
+        }
+        for line in entry.lines
+    ]
+    line_ids = returned_ids(db.execute(INSERT_LINES, lines).all(), lines)
+
+    # Keep the period balance snapshot in step with the posting
+    record_period_activity(db, entry.company_id, entry.date, lines)
+
+    return {
+        "id": entry_id,
+        "company_id": entry.company_id,
+        "date": entry.date,
+        "description": entry.description,
+        "reference": entry.reference,
+        "created_by": user_id,
+        "is_closing": False,
+        "created_at": created_at,
+        "lines": [
+            {
+                "id": line_id,
+                "account_id": line["account_id"],
+                "debit": line["debit"],
+                "credit": line["credit"],
+                "description": line["description"]
+            }
+            for line_id, line in zip(line_ids, lines)
+        ]
+    }
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+from fastapi import Request
+from fastapi.responses import Response
+from ..config import settings
+from .responses import dumps, LedgerJSONResponse
+
+class MemoryBackend:
+    """Bounded in-process LRU"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+class RedisBackend:
+    """Shared cache in Redis (or any server speaking its protocol); entries expire after ttl seconds"""
+
+    def __init__(self, url: str, ttl: int):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("REPORT_CACHE_REDIS_URL is set but the redis package is not installed")
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes) -> None:
+        self.client.set(key, value, ex=self.ttl)
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter("report:*"):
+            self.client.delete(key)
+
+def _create_backend():
+    if settings.REPORT_CACHE_REDIS_URL:
+        return RedisBackend(settings.REPORT_CACHE_REDIS_URL, settings.REPORT_CACHE_TTL_SECONDS)
+    return MemoryBackend(settings.REPORT_CACHE_SIZE)
+
+report_cache_backend = _create_backend()
+
+def report_key(company_id: int, report: str, params: dict, version: int) -> str:
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()[:16]
+    return f"report:{company_id}:{report}:{version}:{digest}"
+
+def _etag_matches(request: Optional[Request], etag: str) -> bool:
+    if request is None:
+        return False
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in [tag.strip() for tag in header.split(",")]
+
+class CachedReport:
+    """Cache lookup for one report request; `response` is set when it can be answered without computing"""
+
+    def __init__(self, request: Optional[Request], company, report: str, params: dict):
+        self.key = report_key(company.id, report, params, company.ledger_version or 0)
+        self.headers = {
+            "ETag": '"' + self.key.split(":", 1)[1].replace(":", "-") + '"',
+            "Cache-Control": "private, no-cache"
+        }
+        self.response: Optional[Response] = None
+
+        # The ETag is derived from the ledger version, so a match needs no cache read at all
+        if _etag_matches(request, self.headers["ETag"]):
+            self.response = Response(status_code=304, headers=self.headers)
+            return
+        body = report_cache_backend.get(self.key)
+        if body is not None:
+            self.response = self._respond(body)
+
+    def _respond(self, body: bytes) -> Response:
+        return LedgerJSONResponse(content=body, headers=self.headers)
+
+    def store(self, report: Any) -> Response:
+        """Serialize a freshly computed report, cache it and return it with its ETag"""
+        body = dumps(report)
+        report_cache_backend.set(self.key, body)
+        return self._respond(body)
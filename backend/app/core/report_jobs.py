@@ -0,0 +1,222 @@
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Callable, Optional, Set
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import SessionLocal, is_memory_sqlite
+from ..models import Company, ReportJob
+from ..models.report_job import ReportJobStatus
+
+logger = logging.getLogger(__name__)
+
+FINISHED = (ReportJobStatus.SUCCEEDED, ReportJobStatus.FAILED, ReportJobStatus.CANCELLED)
+# Queued jobs are picked up at least this often even without a wake-up from this process
+POLL_INTERVAL_SECONDS = 1.0
+PURGE_INTERVAL_SECONDS = 300
+
+def finish_job(
+    db: Session,
+    job_id: int,
+    status: ReportJobStatus,
+    result: Optional[bytes] = None,
+    content_type: Optional[str] = None,
+    error: Optional[str] = None
+) -> bool:
+    """Record a running job's outcome; False if it was cancelled or timed out meanwhile"""
+    finished = db.execute(
+        update(ReportJob)
+        .where(ReportJob.id == job_id, ReportJob.status == ReportJobStatus.RUNNING)
+        .values(status=status, result=result, content_type=content_type, error=error, finished_at=datetime.utcnow())
+    ).rowcount
+    db.commit()
+    return bool(finished)
+
+def cancel_job(db: Session, job: ReportJob) -> bool:
+    """Cancel a queued or running job within the caller's transaction; False if it already finished.
+
+    A running report is not interrupted, but its result is discarded when it completes.
+    """
+    cancelled = db.execute(
+        update(ReportJob)
+        .where(ReportJob.id == job.id, ReportJob.status.in_([ReportJobStatus.QUEUED, ReportJobStatus.RUNNING]))
+        .values(status=ReportJobStatus.CANCELLED, finished_at=datetime.utcnow())
+    ).rowcount
+    return bool(cancelled)
+
+class ReportJobQueue:
+    """Runs queued ReportJobs in a bounded process pool, highest priority first.
+
+    A dispatcher thread claims jobs with a conditional UPDATE, so several API
+    processes can share one queue without running a job twice; a company never has
+    more than company_limit jobs running. runner(job_id) executes in the pool with
+    its own session and records the outcome with finish_job.
+    """
+
+    def __init__(self, runner: Callable[[int], None], workers: int, company_limit: int, timeout: int, retention: int):
+        self.runner = runner
+        self.workers = workers
+        self.company_limit = company_limit
+        self.timeout = timeout
+        self.retention = retention
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._futures: Set[Future] = set()
+        self._executor: Optional[Executor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._last_purge = 0.0
+
+    def start(self) -> None:
+        if self.workers <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="report-jobs", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def wake(self) -> None:
+        """Dispatch now rather than at the next poll, e.g. after a submit or cancel"""
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._dispatch()
+            except Exception:
+                logger.exception("Report job dispatch failed")
+            self._wake.wait(POLL_INTERVAL_SECONDS)
+            self._wake.clear()
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if is_memory_sqlite(settings.DATABASE_URL):
+                # Other processes cannot see an in-memory database
+                self._executor = ThreadPoolExecutor(max_workers=self.workers)
+            else:
+                # Spawned, so workers open their own connections instead of inheriting ours
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+        return self._executor
+
+    def _dispatch(self) -> None:
+        db = SessionLocal()
+        try:
+            self._expire(db)
+            with self._lock:
+                free = self.workers - len(self._futures)
+            if free <= 0:
+                return
+
+            queued = db.execute(
+                select(ReportJob.id, ReportJob.company_id)
+                .where(ReportJob.status == ReportJobStatus.QUEUED)
+                .order_by(ReportJob.priority.desc(), ReportJob.id)
+                .limit(1000)
+            ).all()
+            for job_id, company_id in queued:
+                if free <= 0 or self._stop.is_set():
+                    break
+                if not self._claim(db, job_id, company_id):
+                    continue
+                free -= 1
+                self._submit(job_id)
+        finally:
+            db.close()
+
+    def _claim(self, db: Session, job_id: int, company_id: int) -> bool:
+        # Under READ COMMITTED two claims could both count the same running jobs, so
+        # claims for a company queue on its row lock and each counts after the last commits
+        db.execute(select(Company.id).where(Company.id == company_id).with_for_update())
+        running = select(func.count()).where(
+            ReportJob.company_id == company_id,
+            ReportJob.status == ReportJobStatus.RUNNING
+        ).scalar_subquery()
+        claimed = db.execute(
+            update(ReportJob)
+            .where(ReportJob.id == job_id, ReportJob.status == ReportJobStatus.QUEUED, running < self.company_limit)
+            .values(status=ReportJobStatus.RUNNING, started_at=datetime.utcnow())
+        ).rowcount
+        db.commit()
+        return bool(claimed)
+
+    def _replace_broken_executor(self, executor: Executor) -> None:
+        """Shut down a pool whose worker died and let the next submit start a new one"""
+        with self._lock:
+            if self._executor is not executor:
+                # Already replaced after another of its jobs failed
+                return
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, job_id: int) -> None:
+        executor = self._get_executor()
+        try:
+            future = executor.submit(self.runner, job_id)
+        except BrokenProcessPool:
+            self._replace_broken_executor(executor)
+            executor = self._get_executor()
+            future = executor.submit(self.runner, job_id)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(lambda done: self._done(job_id, executor, done))
+
+    def _done(self, job_id: int, executor: Executor, future: Future) -> None:
+        with self._lock:
+            self._futures.discard(future)
+        if future.cancelled():
+            # Shut down before it started; back to the queue for another process or the next start
+            db = SessionLocal()
+            try:
+                db.execute(
+                    update(ReportJob)
+                    .where(ReportJob.id == job_id, ReportJob.status == ReportJobStatus.RUNNING)
+                    .values(status=ReportJobStatus.QUEUED, started_at=None)
+                )
+                db.commit()
+            finally:
+                db.close()
+        else:
+            exception = future.exception()
+            if exception is not None:
+                # The runner records its own failures, so this is a crashed worker
+                if isinstance(exception, BrokenProcessPool):
+                    self._replace_broken_executor(executor)
+                db = SessionLocal()
+                try:
+                    finish_job(db, job_id, ReportJobStatus.FAILED, error=str(exception))
+                finally:
+                    db.close()
+        self._wake.set()
+
+    def _expire(self, db: Session) -> None:
+        """Fail jobs running past the timeout, e.g. from a process that died, and drop old results"""
+        now = datetime.utcnow()
+        db.execute(
+            update(ReportJob)
+            .where(ReportJob.status == ReportJobStatus.RUNNING, ReportJob.started_at < now - timedelta(seconds=self.timeout))
+            .values(status=ReportJobStatus.FAILED, error="Timed out", finished_at=now)
+        )
+        if time.monotonic() - self._last_purge >= PURGE_INTERVAL_SECONDS:
+            self._last_purge = time.monotonic()
+            db.execute(
+                delete(ReportJob)
+                .where(ReportJob.status.in_(FINISHED), ReportJob.finished_at < now - timedelta(seconds=self.retention))
+            )
+        db.commit()
@@ -0,0 +1,214 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+class RequestTiming:
+    """SQL and serialization totals for the request being handled"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def handler_seconds(self, elapsed: float) -> float:
+        """Time spent in Python outside the database and response encoding"""
+        return max(elapsed - self.db_seconds - self.serialize_seconds, 0.0)
+
+    def server_timing(self) -> str:
+        elapsed = self.elapsed()
+        return ", ".join([
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.statements} statements"',
+            f"app;dur={self.handler_seconds(elapsed) * 1000:.2f}",
+            f"serialize;dur={self.serialize_seconds * 1000:.2f}",
+            f"total;dur={elapsed * 1000:.2f}",
+        ])
+
+# Shared by reference with the threadpool copies of the context that run sync handlers
+_current_timing: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+@contextmanager
+def timed_serialization():
+    """Count the enclosed block as response serialization for the current request"""
+    timing = _current_timing.get()
+    if timing is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.serialize_seconds += time.perf_counter() - started
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class _RouteMetrics:
+    def __init__(self):
+        self.responses: Dict[int, int] = {}
+        self.duration = _Histogram(DURATION_BUCKETS)
+        self.statements = _Histogram(STATEMENT_BUCKETS)
+        self.db_seconds = 0.0
+        self.handler_seconds = 0.0
+        self.serialize_seconds = 0.0
+
+class RequestMetrics:
+    """Per-route request totals rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[Tuple[str, str], _RouteMetrics] = {}
+
+    def record(self, method: str, route: str, status: int, timing: RequestTiming, elapsed: float):
+        with self._lock:
+            metrics = self._routes.get((method, route))
+            if metrics is None:
+                metrics = self._routes[(method, route)] = _RouteMetrics()
+            metrics.responses[status] = metrics.responses.get(status, 0) + 1
+            metrics.duration.observe(elapsed)
+            metrics.statements.observe(timing.statements)
+            metrics.db_seconds += timing.db_seconds
+            metrics.handler_seconds += timing.handler_seconds(elapsed)
+            metrics.serialize_seconds += timing.serialize_seconds
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+    def render(self) -> str:
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines: List[str] = []
+
+            def header(name, kind, help_text):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+            def histogram(name, attribute):
+                for (method, route), metrics in routes:
+                    labels = _labels(method=method, route=route)
+                    data = getattr(metrics, attribute)
+                    cumulative = 0
+                    for bound, count in zip(data.buckets, data.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {data.count}')
+                    lines.append(f"{name}_sum{{{labels}}} {data.sum}")
+                    lines.append(f"{name}_count{{{labels}}} {data.count}")
+
+            def counter(name, attribute):
+                for (method, route), metrics in routes:
+                    lines.append(f"{name}{{{_labels(method=method, route=route)}}} {getattr(metrics, attribute)}")
+
+            header("http_requests_total", "counter", "Requests handled, by route and status.")
+            for (method, route), metrics in routes:
+                for status, count in sorted(metrics.responses.items()):
+                    lines.append(f"http_requests_total{{{_labels(method=method, route=route, status=status)}}} {count}")
+            header("http_request_duration_seconds", "histogram", "Wall time from request start to the last body chunk.")
+            histogram("http_request_duration_seconds", "duration")
+            header("http_request_db_statements", "histogram", "SQL statements executed per request.")
+            histogram("http_request_db_statements", "statements")
+            header("http_request_db_seconds_total", "counter", "Time spent executing SQL.")
+            counter("http_request_db_seconds_total", "db_seconds")
+            header("http_request_handler_seconds_total", "counter", "Time spent in Python outside SQL and serialization.")
+            counter("http_request_handler_seconds_total", "handler_seconds")
+            header("http_request_serialize_seconds_total", "counter", "Time spent encoding response bodies.")
+            counter("http_request_serialize_seconds_total", "serialize_seconds")
+        return "\n".join(lines) + "\n"
+
+def _labels(**labels) -> str:
+    escaped = {key: str(value).replace("\\", "\\\\").replace('"', '\\"') for key, value in labels.items()}
+    return ",".join(f'{key}="{value}"' for key, value in escaped.items())
+
+request_metrics = RequestMetrics()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _finish_statement(conn)
+
+def _handle_error(exception_context):
+    if exception_context.connection is not None:
+        _finish_statement(exception_context.connection)
+
+def _finish_statement(conn):
+    started = conn.info.get("query_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    timing = _current_timing.get()
+    if timing is not None:
+        timing.statements += 1
+        timing.db_seconds += elapsed
+
+def instrument_engine(engine: Engine) -> None:
+    """Attribute every statement run on engine to the request that issued it"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording SQL count, DB, handler and serialization time per route.
+
+    Totals are taken when the last body chunk is sent, so streamed responses
+    include the queries run while streaming. The optional Server-Timing header
+    can only cover the work done before the response starts.
+    """
+
+    def __init__(self, app, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+        token = _current_timing.set(timing)
+        status = 500
+
+        async def send_with_metrics(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", timing.server_timing().encode("latin-1"))
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _current_timing.reset(token)
+            route = scope.get("route")
+            request_metrics.record(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status,
+                timing,
+                timing.elapsed()
+            )
@@ -0,0 +1,51 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+from fastapi.responses import JSONResponse, Response
+from .amounts import CENT
+from .request_metrics import timed_serialization
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def encode_amount(value: Decimal) -> str:
+    """Exact JSON form of a money amount: a 2-place decimal string, as the frontend parses it"""
+    return str(value.quantize(CENT))
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return encode_amount(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    """Serialize plain dicts/lists holding Decimals straight to JSON bytes, with orjson when installed"""
+    with timed_serialization():
+        if orjson is not None:
+            return orjson.dumps(content, default=_default)
+        return json.dumps(content, default=_default, separators=(",", ":")).encode()
+
+class LedgerJSONResponse(Response):
+    """JSON response that renders Decimal amounts exactly and bypasses jsonable_encoder.
+
+    Handlers return plain dicts (or build this response themselves) so large
+    reports and journal pages are encoded in one pass without a Pydantic copy.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        # Bodies encoded earlier, e.g. by the report cache, are sent as-is
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
+
+class TimedJSONResponse(JSONResponse):
+    """FastAPI's default JSON response, with encoding counted as serialization time in request metrics"""
+
+    def render(self, content: Any) -> bytes:
+        with timed_serialization():
+            return super().render(content)
@@ -0,0 +1,67 @@
+import functools
+import inspect
+from typing import Any, Callable
+from fastapi import APIRouter, Depends, Response
+from fastapi.datastructures import DefaultPlaceholder
+from pydantic import TypeAdapter
+from ..config import settings
+from ..database import get_async_db
+
+def asyncify_endpoint(endpoint: Callable, response_model: Any) -> Callable:
+    """Turn a sync handler taking `db: Session` into an async one backed by AsyncSession.
+
+    The handler body runs through AsyncSession.run_sync, so queries await the async
+    driver instead of occupying a worker thread. The response model is applied inside
+    the same greenlet so lazy relationships can still load during serialization.
+    """
+    signature = inspect.signature(endpoint)
+    if "db" not in signature.parameters or inspect.iscoroutinefunction(endpoint):
+        return endpoint
+
+    adapter = TypeAdapter(response_model) if response_model is not None else None
+
+    @functools.wraps(endpoint)
+    async def wrapper(**kwargs):
+        async_db = kwargs.pop("db")
+
+        def call(db):
+            result = endpoint(db=db, **kwargs)
+            if adapter is not None and not isinstance(result, Response):
+                result = adapter.validate_python(result, from_attributes=True)
+            return result
+
+        return await async_db.run_sync(call)
+
+    wrapper.__signature__ = signature.replace(parameters=[
+        param.replace(default=Depends(get_async_db)) if name == "db" else param
+        for name, param in signature.parameters.items()
+    ])
+    return wrapper
+
+def cpu_bound(endpoint: Callable) -> Callable:
+    """Keep a handler on the threadpool with a sync Session even when ASYNC_DATABASE is enabled.
+
+    run_sync executes the whole handler on the event loop, so one that spends its
+    time computing rather than waiting on queries would stall every other request.
+    """
+    endpoint.cpu_bound = True
+    return endpoint
+
+class SessionRouter(APIRouter):
+    """APIRouter that serves `db`-using handlers asynchronously when ASYNC_DATABASE is enabled.
+
+    Pass cpu_bound=True for routers whose handlers are mostly computation (reports),
+    or mark single handlers with @cpu_bound; those stay on the threadpool.
+    """
+
+    def __init__(self, *args, cpu_bound: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cpu_bound = cpu_bound
+
+    def add_api_route(self, path: str, endpoint: Callable, **kwargs):
+        if settings.ASYNC_DATABASE and not (self.cpu_bound or getattr(endpoint, "cpu_bound", False)):
+            response_model = kwargs.get("response_model")
+            if isinstance(response_model, DefaultPlaceholder):
+                response_model = response_model.value
+            endpoint = asyncify_endpoint(endpoint, response_model)
+        return super().add_api_route(path, endpoint, **kwargs)
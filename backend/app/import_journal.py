@@ -0,0 +1,44 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+from app.database import SessionLocal
+from app.models import Company, User
+from app.core.journal_import import import_journal, DEFAULT_CHUNK_SIZE
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import journal entries from NDJSON or CSV")
+    parser.add_argument("path", help="NDJSON or CSV file to import")
+    parser.add_argument("--company-id", type=int, required=True)
+    parser.add_argument("--user-email", required=True, help="User recorded as the entries' creator")
+    parser.add_argument("--format", dest="file_format", choices=["ndjson", "csv"], help="Defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+    
+    file_format = args.file_format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    
+    db = SessionLocal()
+    try:
+        if not db.query(Company).filter(Company.id == args.company_id).first():
+            print("Company not found!")
+            return
+        user = db.query(User).filter(User.email == args.user_email).first()
+        if not user:
+            print("User not found!")
+            return
+        
+        started = time.perf_counter()
+        with open(args.path, encoding="utf-8", newline="") as stream:
+            report = import_journal(db, args.company_id, user.id, stream, file_format, args.chunk_size)
+        elapsed = time.perf_counter() - started
+        
+        print(f"Imported {report['imported']} entries in {elapsed:.1f}s, {report['failed']} failed")
+        for error in report["errors"]:
+            print(f"  row {error['row']}: {error['error']}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,16 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base
+from .config import settings
+from .database import async_engine
+from .migrations import upgrade_database
+from .core.pagination import NEXT_CURSOR_HEADER
+from .core.idempotency import IDEMPOTENT_REPLAY_HEADER
+from .core.request_metrics import RequestMetricsMiddleware, request_metrics, PROMETHEUS_CONTENT_TYPE
+from .core.responses import TimedJSONResponse
+from .core.ledger_events import ledger_event_backend
 
 # Import models to register them with SQLAlchemy
-from .models import user, company, account, journal
+from .models import user, company, account, journal, balance, period, report_job
 
 # Import API routers
 from .api import auth as auth_api
@@ -11,11 +18,10 @@ from .api import companies as companies_api
 from .api import accounts as accounts_api
 from .api import journal as journal_api
 from .api import reports as reports_api
+from .api import admin as admin_api
+from .api import report_jobs as report_jobs_api
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(title="Accounting Software API", version="1.0.0")
+app = FastAPI(title="Accounting Software API", version="1.0.0", default_response_class=TimedJSONResponse)
 
 # Configure CORS
 app.add_middleware(
@@ -24,14 +30,44 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, IDEMPOTENT_REPLAY_HEADER, "Server-Timing"],
 )
 
+# Outermost, so timings cover every other middleware
+if settings.REQUEST_METRICS:
+    app.add_middleware(RequestMetricsMiddleware, server_timing=settings.SERVER_TIMING_HEADER)
+
+@app.on_event("startup")
+def apply_migrations():
+    if settings.AUTO_MIGRATE:
+        upgrade_database()
+
+@app.on_event("startup")
+def start_report_jobs():
+    report_jobs_api.job_queue.start()
+
+@app.on_event("shutdown")
+def stop_report_jobs():
+    report_jobs_api.job_queue.stop()
+
+@app.on_event("shutdown")
+def stop_ledger_events():
+    ledger_event_backend.close()
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    # aiosqlite runs each pooled connection on a non-daemon thread that would keep the process alive
+    if async_engine is not None:
+        await async_engine.dispose()
+
 # Include routers
 app.include_router(auth_api.router, prefix="/api/auth", tags=["auth"])
 app.include_router(companies_api.router, prefix="/api/companies", tags=["companies"])
 app.include_router(accounts_api.router, prefix="/api/accounts", tags=["accounts"])
 app.include_router(journal_api.router, prefix="/api/journal", tags=["journal"])
 app.include_router(reports_api.router, prefix="/api/reports", tags=["reports"])
+app.include_router(admin_api.router, prefix="/api/admin", tags=["admin"])
+app.include_router(report_jobs_api.router, prefix="/api/report-jobs", tags=["report-jobs"])
 
 @app.get("/")
 def read_root():
@@ -39,4 +75,9 @@ def read_root():
 
 @app.get("/api")
 def read_api_root():
-    return {"message": "Accounting Software API", "version": "1.0.0"}
\ No newline at end of file
+    return {"message": "Accounting Software API", "version": "1.0.0"}
+
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    """Per-route request metrics in the Prometheus text format"""
+    return Response(request_metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
\ No newline at end of file
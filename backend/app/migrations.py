@@ -0,0 +1,28 @@
+import os
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+from .database import engine
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Schema that Base.metadata.create_all produced before migrations were introduced
+BASELINE_REVISION = "0001"
+
+def get_alembic_config(connection=None) -> Config:
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    config.attributes["configure_logger"] = False
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+def upgrade_database(bind: Engine = engine, revision: str = "head") -> None:
+    """Bring the schema up to date, adopting databases created by create_all"""
+    with bind.begin() as connection:
+        config = get_alembic_config(connection)
+        tables = set(inspect(connection).get_table_names())
+        if "alembic_version" not in tables and "journal_entries" in tables:
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, revision)
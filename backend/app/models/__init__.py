@@ -1,4 +1,7 @@
 from .user import User
 from .company import Company
 from .account import Account
-from .journal import JournalEntry, JournalLine
\ No newline at end of file
+from .journal import JournalEntry, JournalLine, IdempotencyKey
+from .balance import AccountPeriodBalance, AccountMonthBalance, AccountOpeningBalance
+from .period import FiscalYearClose
+from .report_job import ReportJob
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Enum, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Enum, DateTime, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -24,6 +24,10 @@ class Account(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    __table_args__ = (
+        Index('ix_accounts_company_code', 'company_id', 'code'),
+    )
+    
     company = relationship("Company", back_populates="accounts")
     parent = relationship("Account", remote_side=[id])
     journal_lines = relationship("JournalLine", back_populates="account")
\ No newline at end of file
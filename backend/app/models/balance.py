@@ -0,0 +1,57 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey, Numeric, Index, UniqueConstraint
+from sqlalchemy.orm import relationship
+from ..database import Base
+
+class AccountPeriodBalance(Base):
+    """Daily debit/credit activity per account, maintained alongside journal postings"""
+    __tablename__ = "account_period_balances"
+
+    id = Column(Integer, primary_key=True, index=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
+    account_id = Column(Integer, ForeignKey("accounts.id"), nullable=False)
+    period_date = Column(Date, nullable=False)
+    debit = Column(Numeric(15, 2), nullable=False, default=0)
+    credit = Column(Numeric(15, 2), nullable=False, default=0)
+    
+    __table_args__ = (
+        UniqueConstraint('account_id', 'period_date', name='uq_account_period_balance'),
+        Index('ix_account_period_balances_company_date', 'company_id', 'period_date'),
+    )
+    
+    account = relationship("Account")
+
+class AccountMonthBalance(Base):
+    """Monthly roll-up of AccountPeriodBalance, so long date ranges read one row per account per month"""
+    __tablename__ = "account_month_balances"
+
+    id = Column(Integer, primary_key=True, index=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
+    account_id = Column(Integer, ForeignKey("accounts.id"), nullable=False)
+    month_start = Column(Date, nullable=False)
+    debit = Column(Numeric(15, 2), nullable=False, default=0)
+    credit = Column(Numeric(15, 2), nullable=False, default=0)
+    
+    __table_args__ = (
+        UniqueConstraint('account_id', 'month_start', name='uq_account_month_balance'),
+        Index('ix_account_month_balances_company_month', 'company_id', 'month_start'),
+    )
+    
+    account = relationship("Account")
+
+class AccountOpeningBalance(Base):
+    """Cumulative debit/credit per account carried into a fiscal year by a period close"""
+    __tablename__ = "account_opening_balances"
+
+    id = Column(Integer, primary_key=True, index=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
+    account_id = Column(Integer, ForeignKey("accounts.id"), nullable=False)
+    period_start = Column(Date, nullable=False)
+    debit = Column(Numeric(15, 2), nullable=False, default=0)
+    credit = Column(Numeric(15, 2), nullable=False, default=0)
+    
+    __table_args__ = (
+        UniqueConstraint('account_id', 'period_start', name='uq_account_opening_balance'),
+        Index('ix_account_opening_balances_company_start', 'company_id', 'period_start'),
+    )
+    
+    account = relationship("Account")
@@ -11,6 +11,12 @@ class Company(Base):
     code = Column(String, unique=True, index=True)
     fiscal_year_start = Column(Date, nullable=False)
     currency = Column(String(3), default="USD")
+    # Bumped whenever postings or accounts change; keys cached report results
+    ledger_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # Bumped whenever the company's accounts change; keys the cached account tree and account ids
+    accounts_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # Last day of the latest closed fiscal year; nothing may be posted on or before it
+    closed_through = Column(Date)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Numeric, DateTime, CheckConstraint
-from sqlalchemy.sql import func
+from sqlalchemy import event, Column, Integer, BigInteger, Boolean, String, Date, ForeignKey, Numeric, DateTime, CheckConstraint, Index, UniqueConstraint
+from sqlalchemy.sql import func, false
 from sqlalchemy.orm import relationship
 from ..database import Base
+from ..core.amounts import line_minor
 
 class JournalEntry(Base):
     __tablename__ = "journal_entries"
@@ -12,26 +13,70 @@ class JournalEntry(Base):
     description = Column(String, nullable=False)
     reference = Column(String)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Posted by a period close; left out of income statement activity
+    is_closing = Column(Boolean, nullable=False, default=False, server_default=false())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    __table_args__ = (
+        Index('ix_journal_entries_company_date_id', 'company_id', 'date', 'id'),
+        Index('ix_journal_entries_company_reference', 'company_id', 'reference'),
+    )
+    
     company = relationship("Company", back_populates="journal_entries")
     created_by_user = relationship("User", back_populates="journal_entries")
     lines = relationship("JournalLine", back_populates="entry", cascade="all, delete-orphan")
 
+def _amount_minor_default(context):
+    # Filled from debit/credit for ORM adds and bulk inserts alike
+    params = context.get_current_parameters()
+    return line_minor(params.get("debit"), params.get("credit"))
+
 class JournalLine(Base):
     __tablename__ = "journal_lines"
 
     id = Column(Integer, primary_key=True, index=True)
     entry_id = Column(Integer, ForeignKey("journal_entries.id"), nullable=False)
     account_id = Column(Integer, ForeignKey("accounts.id"), nullable=False)
+    # Copied from the entry so ledger aggregates filter lines without joining journal_entries
+    company_id = Column(Integer, ForeignKey("companies.id", name="fk_journal_lines_company_id"), nullable=False)
+    entry_date = Column(Date, nullable=False)
     debit = Column(Numeric(15, 2), default=0)
     credit = Column(Numeric(15, 2), default=0)
+    # Signed integer cents (debit positive, credit negative) for exact integer aggregation
+    amount_minor = Column(BigInteger, default=_amount_minor_default)
     description = Column(String)
     
     __table_args__ = (
         CheckConstraint('(debit = 0 AND credit > 0) OR (debit > 0 AND credit = 0)', name='debit_credit_check'),
+        Index('ix_journal_lines_entry_id', 'entry_id'),
+        Index('ix_journal_lines_account_entry', 'account_id', 'entry_id', postgresql_include=['debit', 'credit', 'amount_minor']),
+        Index('ix_journal_lines_company_date', 'company_id', 'entry_date', 'account_id', postgresql_include=['debit', 'credit', 'amount_minor']),
     )
     
     entry = relationship("JournalEntry", back_populates="lines")
-    account = relationship("Account", back_populates="journal_lines")
\ No newline at end of file
+    account = relationship("Account", back_populates="journal_lines")
+
+@event.listens_for(JournalLine, "before_insert")
+def _copy_entry_columns(mapper, connection, target):
+    # Lines added through the ORM take them from their entry; bulk inserts pass them explicitly
+    if target.company_id is None or target.entry_date is None:
+        target.company_id = target.entry.company_id
+        target.entry_date = target.entry.date
+
+class IdempotencyKey(Base):
+    """Client Idempotency-Key of a journal posting, so a retried POST returns the entry it created"""
+    __tablename__ = "idempotency_keys"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    key = Column(String(255), nullable=False)
+    # SHA-256 of the request body; reusing a key for a different entry is rejected
+    request_hash = Column(String(64), nullable=False)
+    entry_id = Column(Integer, ForeignKey("journal_entries.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime, nullable=False, index=True)
+    
+    __table_args__ = (
+        UniqueConstraint('user_id', 'key', name='uq_idempotency_key_user_key'),
+    )
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from ..database import Base
+
+class FiscalYearClose(Base):
+    """A closed fiscal year: its closing entry and who closed it"""
+    __tablename__ = "fiscal_year_closes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    retained_earnings_account_id = Column(Integer, ForeignKey("accounts.id"), nullable=False)
+    closing_entry_id = Column(Integer, ForeignKey("journal_entries.id"))
+    closed_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    closed_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('company_id', 'end_date', name='uq_fiscal_year_close'),
+    )
+    
+    closing_entry = relationship("JournalEntry")
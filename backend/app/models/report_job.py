@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, JSON, LargeBinary, Index
+from sqlalchemy.sql import func
+import enum
+from ..database import Base
+
+class ReportJobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class ReportJob(Base):
+    """A report run in the background job pool; the finished response body is kept for download"""
+    __tablename__ = "report_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
+    # Report name as listed by GET /api/report-jobs/reports, e.g. "trial-balance"
+    report = Column(String(64), nullable=False)
+    params = Column(JSON, nullable=False)
+    # Higher runs first
+    priority = Column(Integer, nullable=False, default=0)
+    status = Column(Enum(ReportJobStatus), nullable=False, default=ReportJobStatus.QUEUED)
+    error = Column(Text)
+    result = Column(LargeBinary)
+    content_type = Column(String(100))
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    
+    __table_args__ = (
+        Index('ix_report_jobs_status_priority', 'status', 'priority', 'id'),
+        Index('ix_report_jobs_company_status', 'company_id', 'status'),
+    )
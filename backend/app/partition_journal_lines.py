@@ -0,0 +1,41 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.core.partitions import plan_partitions, apply_statements
+
+def partition_journal_lines(db: Session, years_ahead: int = 1, company_id: int = None, sql_only: bool = False):
+    """Partition journal_lines by company and fiscal year on PostgreSQL, adding any missing partitions"""
+    try:
+        statements = plan_partitions(db, years_ahead, company_id)
+        if sql_only:
+            for statement in statements:
+                print(f"{statement};")
+            return
+        
+        apply_statements(db, statements)
+        db.commit()
+        print(f"Journal line partitions up to date ({len(statements)} statements run)")
+        
+    except Exception as e:
+        print(f"Error partitioning journal lines: {e}")
+        db.rollback()
+
+def main():
+    parser = argparse.ArgumentParser(description="Partition journal_lines by company and fiscal year (PostgreSQL only)")
+    parser.add_argument("--years-ahead", type=int, default=1, help="Fiscal years to create past the current one")
+    parser.add_argument("--company-id", type=int, help="Only add partitions for this company")
+    parser.add_argument("--sql", action="store_true", help="Print the statements instead of running them")
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        partition_journal_lines(db, args.years_ahead, args.company_id, args.sql)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
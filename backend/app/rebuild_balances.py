@@ -0,0 +1,42 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.models import Company
+from app.core.balances import rebuild_period_balances, backfill_amount_minor
+
+def rebuild_all(db: Session, company_id: int = None):
+    """Rebuild the account period balance snapshot (and any missing amount_minor) for one or all companies"""
+    try:
+        query = db.query(Company)
+        if company_id is not None:
+            query = query.filter(Company.id == company_id)
+        
+        for company in query.all():
+            filled = backfill_amount_minor(db, company.id)
+            rows = rebuild_period_balances(db, company.id)
+            print(f"{company.name}: {rows} period balance rows, {filled} lines backfilled with amount_minor")
+        
+        db.commit()
+        print("Period balances rebuilt successfully!")
+        
+    except Exception as e:
+        print(f"Error rebuilding period balances: {e}")
+        db.rollback()
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild account period balance snapshots")
+    parser.add_argument("--company-id", type=int, help="Only rebuild this company")
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        rebuild_all(db, args.company_id)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import signal
+import threading
+from app.config import settings
+from app.core.report_jobs import ReportJobQueue
+from app.api.report_jobs import run_report_job
+
+def main():
+    parser = argparse.ArgumentParser(description="Run queued report jobs outside the API processes")
+    parser.add_argument("--workers", type=int, default=max(settings.REPORT_JOB_WORKERS, 2), help="Worker processes")
+    args = parser.parse_args()
+    
+    queue = ReportJobQueue(
+        run_report_job,
+        args.workers,
+        settings.REPORT_JOB_COMPANY_CONCURRENCY,
+        settings.REPORT_JOB_TIMEOUT_SECONDS,
+        settings.REPORT_JOB_RETENTION_SECONDS
+    )
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    queue.start()
+    print(f"Running report jobs with {args.workers} workers")
+    try:
+        stopped.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        queue.stop()
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
-from .user import UserCreate, User, UserLogin, Token
+from .user import UserCreate, User, UserLogin, Token, StreamToken
 from .company import CompanyCreate, Company
 from .account import AccountCreate, Account
-from .journal import JournalEntryCreate, JournalEntry, JournalLineCreate
\ No newline at end of file
+from .journal import JournalEntryCreate, JournalEntry, JournalLineCreate
+from .period import FiscalYearCloseCreate, FiscalYearClose
+from .report_job import ReportJobCreate, ReportJob
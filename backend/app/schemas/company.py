@@ -13,6 +13,7 @@ class CompanyCreate(CompanyBase):
 
 class Company(CompanyBase):
     id: int
+    closed_through: Optional[date] = None
     created_at: datetime
     updated_at: Optional[datetime]
     
@@ -2,6 +2,7 @@ from pydantic import BaseModel, validator
 from typing import List, Optional
 from datetime import date, datetime
 from decimal import Decimal
+from ..core.amounts import from_minor, line_minor, to_minor
 
 class JournalLineCreate(BaseModel):
     account_id: int
@@ -13,6 +14,9 @@ class JournalLineCreate(BaseModel):
     def validate_amounts(cls, v):
         if v < 0:
             raise ValueError('Amount must be non-negative')
+        # Amounts are stored in cents; rejected rather than rounded so nothing is silently changed
+        if v.normalize().as_tuple().exponent < -2:
+            raise ValueError('Amount must have at most 2 decimal places')
         return v
     
     @validator('credit')
@@ -31,9 +35,11 @@ class JournalEntryCreate(BaseModel):
     
     @validator('lines')
     def validate_balanced(cls, v):
-        total_debit = sum(line.debit for line in v)
-        total_credit = sum(line.credit for line in v)
-        if total_debit != total_credit:
+        # Compare in integer cents rather than summing Decimals
+        total = sum(line_minor(line.debit, line.credit) for line in v)
+        if total != 0:
+            total_debit = from_minor(sum(to_minor(line.debit) for line in v))
+            total_credit = from_minor(sum(to_minor(line.credit) for line in v))
             raise ValueError(f'Entry must be balanced. Debit: {total_debit}, Credit: {total_credit}')
         if len(v) < 2:
             raise ValueError('Entry must have at least 2 lines')
@@ -56,6 +62,7 @@ class JournalEntry(BaseModel):
     description: str
     reference: Optional[str]
     created_by: int
+    is_closing: bool = False
     created_at: datetime
     lines: List[JournalLine]
     
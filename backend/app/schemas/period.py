@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from datetime import date, datetime
+from typing import Optional
+
+class FiscalYearCloseCreate(BaseModel):
+    fiscal_year_end: date
+    retained_earnings_account_id: int
+
+class FiscalYearClose(BaseModel):
+    id: int
+    company_id: int
+    start_date: date
+    end_date: date
+    retained_earnings_account_id: int
+    closing_entry_id: Optional[int]
+    closed_by: int
+    closed_at: datetime
+    
+    class Config:
+        from_attributes = True
@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Dict, Optional
+from ..models.report_job import ReportJobStatus
+
+class ReportJobCreate(BaseModel):
+    company_id: int
+    report: str
+    # Query parameters of the report endpoint, e.g. {"as_of_date": "2025-12-31"}
+    params: Dict[str, Any] = {}
+    priority: int = 0
+
+class ReportJob(BaseModel):
+    id: int
+    company_id: int
+    report: str
+    params: Dict[str, Any]
+    priority: int
+    status: ReportJobStatus
+    error: Optional[str]
+    content_type: Optional[str]
+    created_by: int
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
@@ -27,5 +27,9 @@ class Token(BaseModel):
     access_token: str
     token_type: str
 
+class StreamToken(BaseModel):
+    stream_token: str
+    expires_in: int
+
 class TokenData(BaseModel):
     user_id: Optional[int] = None
\ No newline at end of file
@@ -0,0 +1,273 @@
+"""Time every report, journal and account endpoint over a synthetic ledger.
+
+Usage: python benchmarks/api_suite.py [--scale 10k|1m|10m | --lines N] [--database-url URL]
+       [--repeat 20] [--compare benchmarks/results/previous.json] [--threshold 0.2]
+
+Without --database-url a throwaway SQLite file is used; pass a local Postgres URL
+to benchmark that instead. Endpoints are called through the ASGI app with a
+TestClient. p50/p95 latency come from --repeat timed calls; SQL statement count
+and peak traced Python memory come from one extra call. Report caches are
+cleared before each call unless --keep-cache is given. Results are written as
+JSON under benchmarks/results/. With --compare the run is checked against an
+earlier result file and the script exits with status 1 when any endpoint's p50
+regresses by more than --threshold, or when an endpoint in STATEMENT_BUDGETS runs
+more SQL statements than its budget.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+SCALES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+# Regressions smaller than this many milliseconds are treated as noise
+MIN_REGRESSION_MS = 1.0
+# Most SQL statements a write may run, independent of how many rows it writes
+STATEMENT_BUDGETS = {"journal.create": 8, "journal.import_100": 12}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="10k", help="Total journal lines to generate")
+    parser.add_argument("--lines", type=int, help="Exact target line count (overrides --scale)")
+    parser.add_argument("--companies", type=int, default=1)
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--lines-per-entry", type=int, default=2)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--breadth", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url")
+    parser.add_argument("--keep-cache", action="store_true", help="Leave report caches warm between calls")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<dialect>-<scale>-<time>.json)")
+    parser.add_argument("--compare", help="Earlier result file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed p50 slowdown as a fraction")
+    return parser.parse_args()
+
+args = parse_args()
+if args.database_url:
+    os.environ["DATABASE_URL"] = args.database_url
+else:
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.main import app
+from app.database import SessionLocal, engine
+from app.migrations import upgrade_database
+from app.core.cache import dashboard_cache
+from app.core.report_cache import report_cache_backend
+from app.core.security import create_access_token
+from ledger_generator import generate_ledger, entries_per_day_for, get_bench_user
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+def endpoints(company, first_day, last_day):
+    """(name, method, url, request kwargs factory) for every endpoint under test"""
+    company_id = company.id
+    account_id = company.leaf_account_ids[0]
+    year_start = last_day - timedelta(days=364)
+    counter = iter(range(10**9))
+
+    def new_entry():
+        amount = "12.34"
+        return {"json": {
+            "company_id": company_id, "date": last_day.isoformat(), "description": "Benchmark entry",
+            "lines": [
+                {"account_id": company.leaf_account_ids[0], "debit": amount},
+                {"account_id": company.leaf_account_ids[1], "credit": amount}
+            ]
+        }}
+
+    def import_file():
+        rows = "".join(
+            json.dumps({
+                "date": last_day.isoformat(), "description": "Benchmark import",
+                "lines": [
+                    {"account_id": company.leaf_account_ids[0], "debit": "1.00"},
+                    {"account_id": company.leaf_account_ids[1], "credit": "1.00"}
+                ]
+            }) + "\n"
+            for _ in range(100)
+        )
+        return {"files": {"file": ("entries.ndjson", rows)}}
+
+    def new_account():
+        return {"json": {
+            "company_id": company_id, "code": f"9{next(counter):08d}",
+            "name": "Benchmark account", "type": "asset"
+        }}
+
+    reports = "/api/reports"
+    return [
+        ("reports.balance_sheet", "GET", f"{reports}/balance-sheet/{company_id}?as_of_date={last_day}", None),
+        ("reports.balance_sheet_rollup", "GET",
+         f"{reports}/balance-sheet/{company_id}?as_of_date={last_day}&rollup=true", None),
+        ("reports.income_statement", "GET",
+         f"{reports}/income-statement/{company_id}?start_date={year_start}&end_date={last_day}", None),
+        ("reports.trial_balance", "GET", f"{reports}/trial-balance/{company_id}?as_of_date={last_day}", None),
+        ("reports.income_statement_comparative", "GET",
+         f"{reports}/income-statement/{company_id}/comparative?start_date={year_start}&end_date={last_day}", None),
+        ("reports.balance_sheet_comparative", "GET",
+         f"{reports}/balance-sheet/{company_id}/comparative?start_date={year_start}&end_date={last_day}", None),
+        ("reports.balance_series_daily", "GET",
+         f"{reports}/balance-series/{company_id}?start_date={year_start}&end_date={last_day}&"
+         + "&".join(f"account_id={leaf_id}" for leaf_id in company.leaf_account_ids[:20]), None),
+        ("reports.general_ledger_account", "GET",
+         f"{reports}/general-ledger/{company_id}?start_date={year_start}&end_date={last_day}"
+         f"&account_id={account_id}&format=ndjson", None),
+        ("reports.dashboard", "GET", f"{reports}/dashboard/", None),
+        ("journal.list", "GET", f"/api/journal/?company_id={company_id}&limit=100", None),
+        ("journal.list_by_account", "GET",
+         f"/api/journal/?company_id={company_id}&account_id={account_id}&limit=100", None),
+        ("journal.list_by_reference", "GET", f"/api/journal/?company_id={company_id}&reference=SYN-1", None),
+        ("journal.get", "GET", f"/api/journal/{company.first_entry_id}", None),
+        ("journal.create", "POST", "/api/journal/", new_entry),
+        ("journal.import_100", "POST", f"/api/journal/import?company_id={company_id}", import_file),
+        ("accounts.list", "GET", f"/api/accounts/?company_id={company_id}", None),
+        ("accounts.get", "GET", f"/api/accounts/{account_id}", None),
+        ("accounts.create", "POST", "/api/accounts/", new_account),
+    ]
+
+def call(client, headers, method, url, make_kwargs, keep_cache):
+    if not keep_cache:
+        report_cache_backend.clear()
+        dashboard_cache.clear()
+    kwargs = make_kwargs() if make_kwargs is not None else {}
+    response = client.request(method, url, headers=headers, **kwargs)
+    response.read()
+    return response.status_code
+
+def measure(client, headers, method, url, make_kwargs, counter):
+    samples = []
+    status = None
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        status = call(client, headers, method, url, make_kwargs, args.keep_cache)
+        samples.append((time.perf_counter() - started) * 1000)
+
+    # One more call for statement count and peak memory, which would skew the timings
+    counter.count = 0
+    tracemalloc.start()
+    call(client, headers, method, url, make_kwargs, args.keep_cache)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    cuts = statistics.quantiles(samples, n=20) if len(samples) > 1 else samples * 19
+    return {
+        "status": status,
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(cuts[18], 3),
+        "queries": counter.count,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, previous_path, threshold):
+    """Print p50 changes against an earlier run and return the names that regressed"""
+    with open(previous_path) as f:
+        previous = json.load(f)["endpoints"]
+    regressions = []
+    print(f"\nAgainst {previous_path}:")
+    print(f"{'endpoint':<40}{'before':>10}{'after':>10}{'change':>10}")
+    for name, result in results.items():
+        if name not in previous:
+            continue
+        before, after = previous[name]["p50_ms"], result["p50_ms"]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > threshold and after - before > MIN_REGRESSION_MS:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<40}{before:>10.1f}{after:>10.1f}{change:>+10.0%}{flag}")
+    return regressions
+
+def over_budget(results):
+    """Print endpoints running more statements than STATEMENT_BUDGETS allows and return their names"""
+    over = []
+    for name, budget in STATEMENT_BUDGETS.items():
+        if name in results and results[name]["queries"] > budget:
+            over.append(name)
+            print(f"{name} ran {results[name]['queries']} SQL statements, over its budget of {budget}")
+    return over
+
+def main():
+    lines = args.lines or SCALES[args.scale]
+    entries_per_day = entries_per_day_for(lines, args.companies, args.years, args.lines_per_entry)
+    first_day = date(2020, 1, 1)
+    last_day = first_day + timedelta(days=args.years * 365 - 1)
+
+    upgrade_database()
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        generated = generate_ledger(
+            db, args.companies, args.depth, args.breadth, entries_per_day, args.lines_per_entry,
+            args.years, first_day
+        )
+        token = create_access_token(data={"sub": str(get_bench_user(db).id)})
+        db.commit()
+    finally:
+        db.close()
+    total_lines = sum(company.lines for company in generated)
+    print(f"Generated {total_lines} lines in {time.perf_counter() - started:.1f}s on {engine.dialect.name}")
+
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    headers = {"Authorization": f"Bearer {token}"}
+    results = {}
+    print(f"{'endpoint':<40}{'status':>6}{'p50 ms':>10}{'p95 ms':>10}{'SQL':>6}{'peak KiB':>12}")
+    with TestClient(app) as client:
+        for name, method, url, make_kwargs in endpoints(generated[0], first_day, last_day):
+            results[name] = measure(client, headers, method, url, make_kwargs, counter)
+            result = results[name]
+            print(f"{name:<40}{result['status']:>6}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}"
+                  f"{result['queries']:>6}{result['peak_kib']:>12.1f}")
+
+    label = args.scale if not args.lines else f"{args.lines}lines"
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{engine.dialect.name}-{label}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "meta": {
+                "dialect": engine.dialect.name,
+                "lines": total_lines,
+                "companies": args.companies,
+                "years": args.years,
+                "repeat": args.repeat,
+                "keep_cache": args.keep_cache,
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+            },
+            "endpoints": results,
+        }, f, indent=2)
+    print(f"Results written to {output}")
+
+    failed = over_budget(results)
+    if args.compare and compare(results, args.compare, args.threshold):
+        failed = True
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Check that a slow report does not hold up light requests served alongside it.
+
+Usage: python benchmarks/event_loop.py [--lines 200000] [--database-url URL] [--sync] [--repeat 5]
+
+Requests go through the ASGI app on one event loop with httpx's ASGITransport,
+as uvicorn serves them. Light requests (an account lookup) are timed on their
+own, then again while slow reports (balance series, with report caches cleared)
+run concurrently. With ASYNC_DATABASE, handlers that run on the event loop
+through run_sync would delay the light requests by the report's full compute
+time; CPU-bound handlers stay on the threadpool so they should not. Pass --sync
+to measure with ASYNC_DATABASE off instead.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200_000, help="Journal lines to generate")
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--database-url")
+    parser.add_argument("--sync", action="store_true", help="Leave ASYNC_DATABASE off")
+    parser.add_argument("--repeat", type=int, default=5, help="Slow reports to run")
+    return parser.parse_args()
+
+args = parse_args()
+if args.database_url:
+    os.environ["DATABASE_URL"] = args.database_url
+else:
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ["ASYNC_DATABASE"] = "false" if args.sync else "true"
+
+import httpx
+from app.main import app
+from app.database import SessionLocal, async_engine
+from app.migrations import upgrade_database
+from app.core.ledger_cache import ledger_cache
+from app.core.report_cache import report_cache_backend
+from app.core.security import create_access_token
+from ledger_generator import generate_ledger, entries_per_day_for, get_bench_user
+
+# Pause between light requests, so they sample the whole of each slow one
+LIGHT_INTERVAL_SECONDS = 0.005
+
+def summarize(samples):
+    return f"p50 {statistics.median(samples):8.1f} ms   max {max(samples):8.1f} ms   n={len(samples)}"
+
+async def timed_get(client, url):
+    started = time.perf_counter()
+    response = await client.get(url)
+    response.raise_for_status()
+    return (time.perf_counter() - started) * 1000
+
+async def light_requests(client, url, until):
+    samples = []
+    while not until.is_set():
+        samples.append(await timed_get(client, url))
+        await asyncio.sleep(LIGHT_INTERVAL_SECONDS)
+    return samples
+
+async def slow_reports(client, url):
+    samples = []
+    for _ in range(args.repeat):
+        report_cache_backend.clear()
+        ledger_cache.clear()
+        samples.append(await timed_get(client, url))
+    return samples
+
+async def run(company, headers, first_day, last_day):
+    year_start = last_day - timedelta(days=364)
+    light_url = f"/api/accounts/{company.leaf_account_ids[0]}"
+    slow_url = (
+        f"/api/reports/balance-series/{company.id}?start_date={year_start}&end_date={last_day}&"
+        + "&".join(f"account_id={leaf_id}" for leaf_id in company.leaf_account_ids[:20])
+    )
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers, timeout=None) as client:
+        # Warm up connections and compiled statements
+        await client.get(light_url)
+        alone = [await timed_get(client, light_url) for _ in range(50)]
+
+        done = asyncio.Event()
+        light = asyncio.create_task(light_requests(client, light_url, done))
+        slow = await slow_reports(client, slow_url)
+        done.set()
+        during = await light
+    if async_engine is not None:
+        # aiosqlite's connection threads would otherwise keep the process alive
+        await async_engine.dispose()
+
+    print(f"slow report             {summarize(slow)}")
+    print(f"light request alone     {summarize(alone)}")
+    print(f"light during report     {summarize(during)}")
+
+def main():
+    first_day = date(2020, 1, 1)
+    last_day = first_day + timedelta(days=args.years * 365 - 1)
+    upgrade_database()
+    db = SessionLocal()
+    try:
+        generated = generate_ledger(
+            db, 1, 3, 4, entries_per_day_for(args.lines, 1, args.years, 2), 2, args.years, first_day
+        )
+        token = create_access_token(data={"sub": str(get_bench_user(db).id)})
+        db.commit()
+    finally:
+        db.close()
+    mode = "sync" if args.sync else "ASYNC_DATABASE"
+    print(f"Generated {generated[0].lines} lines; serving with {mode}")
+    asyncio.run(run(generated[0], {"Authorization": f"Bearer {token}"}, first_day, last_day))
+
+if __name__ == "__main__":
+    main()
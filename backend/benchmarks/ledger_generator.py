@@ -0,0 +1,207 @@
+"""Fill a database with synthetic companies, account trees and journal entries.
+
+Usage: python benchmarks/ledger_generator.py [--companies 1] [--depth 3] [--breadth 4]
+       [--entries-per-day 20] [--lines-per-entry 2] [--years 2] [--lines N] [--snapshot]
+
+Runs against DATABASE_URL (or --database-url), migrating it to head first.
+--lines sets --entries-per-day so the total number of journal lines is about N.
+Amounts, accounts and dates come from a seeded RNG, so runs are repeatable.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import math
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import List, NamedTuple
+
+BATCH_SIZE = 5000
+TYPE_DIGITS = {"asset": 1, "liability": 2, "equity": 3, "revenue": 4, "expense": 5}
+BENCH_EMAIL = "bench@example.com"
+
+class GeneratedCompany(NamedTuple):
+    id: int
+    account_ids: List[int]
+    leaf_account_ids: List[int]
+    first_entry_id: int
+    entries: int
+    lines: int
+
+def entries_per_day_for(lines: int, companies: int, years: int, lines_per_entry: int) -> int:
+    """Entries per day per company needed for about `lines` journal lines in total"""
+    days = years * 365
+    return max(1, math.ceil(lines / (companies * days * lines_per_entry)))
+
+def get_bench_user(db):
+    from app.models import User
+    from app.models.user import UserRole
+
+    user = db.query(User).filter(User.email == BENCH_EMAIL).first()
+    if user is None:
+        user = User(email=BENCH_EMAIL, hashed_password="!", full_name="Benchmark", role=UserRole.ADMIN)
+        db.add(user)
+        db.flush()
+    return user
+
+def create_account_tree(db, company_id: int, depth: int, breadth: int):
+    """One root per account type with `breadth` children per node down to `depth` levels"""
+    from app.models import Account
+    from app.models.account import AccountType
+
+    account_ids = []
+    leaves = []
+    for account_type in AccountType:
+        digit = TYPE_DIGITS[account_type.value]
+        counter = 0
+        level = [None]
+        for current_depth in range(depth):
+            next_level = []
+            for parent in level:
+                for _ in range(1 if parent is None else breadth):
+                    account = Account(
+                        company_id=company_id,
+                        code=f"{digit}{counter:05d}",
+                        name=f"{account_type.value.title()} {counter}",
+                        type=account_type,
+                        parent_id=parent.id if parent is not None else None
+                    )
+                    counter += 1
+                    db.add(account)
+                    next_level.append(account)
+            db.flush()
+            account_ids.extend(account.id for account in next_level)
+            level = next_level
+        leaves.extend(account.id for account in level)
+    return account_ids, leaves
+
+def generate_ledger(
+    db,
+    companies: int = 1,
+    depth: int = 3,
+    breadth: int = 4,
+    entries_per_day: int = 20,
+    lines_per_entry: int = 2,
+    years: int = 2,
+    start: date = date(2020, 1, 1),
+    seed: int = 42,
+    snapshot: bool = False,
+    progress=None
+) -> List[GeneratedCompany]:
+    """Create companies with account trees and balanced entries on every day of `years` years"""
+    from sqlalchemy import insert
+    from app.models import Company, JournalEntry, JournalLine
+    from app.core.balances import rebuild_period_balances
+    from app.core.cache import bump_ledger_version
+
+    rng = random.Random(seed)
+    lines_per_entry = max(2, lines_per_entry)
+    user = get_bench_user(db)
+    days = years * 365
+    generated = []
+
+    for _ in range(companies):
+        company = Company(
+            name=f"Synthetic {rng.randint(0, 10**9)}",
+            code=f"SYN{rng.randint(0, 10**9)}",
+            fiscal_year_start=start
+        )
+        db.add(company)
+        db.flush()
+        account_ids, leaves = create_account_tree(db, company.id, depth, breadth)
+        db.commit()
+
+        total_entries = days * entries_per_day
+        total_lines = 0
+        first_entry_id = None
+        for offset in range(0, total_entries, BATCH_SIZE):
+            batch = range(offset, min(offset + BATCH_SIZE, total_entries))
+            entry_ids = db.execute(
+                insert(JournalEntry).returning(JournalEntry.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "company_id": company.id,
+                        "date": start + timedelta(days=i // entries_per_day),
+                        "description": "Synthetic entry",
+                        "reference": f"SYN-{i}",
+                        "created_by": user.id
+                    }
+                    for i in batch
+                ]
+            ).scalars().all()
+            if first_entry_id is None:
+                first_entry_id = entry_ids[0]
+
+            lines = []
+            for i, entry_id in zip(batch, entry_ids):
+                entry_date = start + timedelta(days=i // entries_per_day)
+                # Debit lines with random amounts, balanced by a single credit line
+                accounts = rng.sample(leaves, min(lines_per_entry, len(leaves)))
+                amounts = [rng.randint(100, 100000) for _ in accounts[:-1]]
+                for account_id, cents in zip(accounts, amounts):
+                    lines.append({
+                        "entry_id": entry_id, "company_id": company.id, "entry_date": entry_date,
+                        "account_id": account_id,
+                        "debit": Decimal(cents).scaleb(-2), "credit": Decimal("0.00"), "amount_minor": cents
+                    })
+                lines.append({
+                    "entry_id": entry_id, "company_id": company.id, "entry_date": entry_date,
+                    "account_id": accounts[-1],
+                    "debit": Decimal("0.00"), "credit": Decimal(sum(amounts)).scaleb(-2),
+                    "amount_minor": -sum(amounts)
+                })
+            db.execute(insert(JournalLine), lines)
+            total_lines += len(lines)
+            db.commit()
+            if progress is not None:
+                progress(company.id, offset + len(batch), total_entries)
+
+        if snapshot:
+            rebuild_period_balances(db, company.id)
+        bump_ledger_version(db, company.id)
+        db.commit()
+        generated.append(GeneratedCompany(company.id, account_ids, leaves, first_entry_id, total_entries, total_lines))
+    return generated
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--companies", type=int, default=1)
+    parser.add_argument("--depth", type=int, default=3, help="Levels in each account type's tree")
+    parser.add_argument("--breadth", type=int, default=4, help="Children per account")
+    parser.add_argument("--entries-per-day", type=int, default=20)
+    parser.add_argument("--lines-per-entry", type=int, default=2)
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--lines", type=int, help="Target total journal lines (overrides --entries-per-day)")
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2020, 1, 1))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--snapshot", action="store_true", help="Build the period balance snapshot afterwards")
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    from app.database import SessionLocal
+    from app.migrations import upgrade_database
+
+    entries_per_day = args.entries_per_day
+    if args.lines:
+        entries_per_day = entries_per_day_for(args.lines, args.companies, args.years, args.lines_per_entry)
+
+    upgrade_database()
+    db = SessionLocal()
+    try:
+        generated = generate_ledger(
+            db, args.companies, args.depth, args.breadth, entries_per_day, args.lines_per_entry,
+            args.years, args.start, args.seed, args.snapshot,
+            progress=lambda company_id, done, total: print(f"company {company_id}: {done}/{total} entries", end="\r")
+        )
+    finally:
+        db.close()
+    print()
+    for company in generated:
+        print(f"company {company.id}: {len(company.account_ids)} accounts, {company.entries} entries, {company.lines} lines")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Time reports with and without the ledger hot-path indexes.
+
+Usage: python benchmarks/report_indexes.py [--entries 20000] [--accounts 200] [--database-url URL]
+
+Without --database-url a throwaway SQLite file is used. The database is
+migrated to head, filled with synthetic entries, and each report is timed
+first with the hot-path indexes dropped and then with them recreated.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+HOT_PATH_INDEXES = [
+    "ix_accounts_company_code",
+    "ix_journal_entries_company_date_id",
+    "ix_journal_entries_company_reference",
+    "ix_journal_lines_entry_id",
+    "ix_journal_lines_account_entry",
+]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=20000)
+    parser.add_argument("--accounts", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url")
+    return parser.parse_args()
+
+args = parse_args()
+if args.database_url:
+    os.environ["DATABASE_URL"] = args.database_url
+else:
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+
+from sqlalchemy import insert, text
+from app.database import Base, SessionLocal, engine
+from app.migrations import upgrade_database
+from app.models import User, Company, Account, JournalEntry, JournalLine
+from app.models.account import AccountType
+from app.api import reports, journal
+from app.core.report_cache import report_cache_backend
+
+def seed(db, n_accounts, n_entries):
+    user = User(email="bench@example.com", hashed_password="x", full_name="Bench")
+    company = Company(name="Bench Co", code=f"BENCH{random.randint(0, 10**6)}", fiscal_year_start=date(2020, 1, 1))
+    db.add_all([user, company])
+    db.flush()
+
+    types = list(AccountType)
+    accounts = [
+        Account(company_id=company.id, code=str(1000 + i), name=f"Account {i}", type=types[i % len(types)])
+        for i in range(n_accounts)
+    ]
+    db.add_all(accounts)
+    db.flush()
+    account_ids = [account.id for account in accounts]
+
+    start = date(2020, 1, 1)
+    rng = random.Random(42)
+    for offset in range(0, n_entries, 5000):
+        batch = range(offset, min(offset + 5000, n_entries))
+        entry_ids = db.execute(
+            insert(JournalEntry).returning(JournalEntry.id, sort_by_parameter_order=True),
+            [
+                {
+                    "company_id": company.id,
+                    "date": start + timedelta(days=i % 1800),
+                    "description": "Synthetic entry",
+                    "reference": f"REF-{i}",
+                    "created_by": user.id
+                }
+                for i in batch
+            ]
+        ).scalars().all()
+        lines = []
+        for entry_id in entry_ids:
+            amount = Decimal(rng.randint(100, 100000)) / 100
+            debit_account, credit_account = rng.sample(account_ids, 2)
+            lines.append({"entry_id": entry_id, "account_id": debit_account, "debit": amount, "credit": 0})
+            lines.append({"entry_id": entry_id, "account_id": credit_account, "debit": 0, "credit": amount})
+        db.execute(insert(JournalLine), lines)
+    db.commit()
+    return company.id, account_ids[0]
+
+def scenarios(company_id, account_id):
+    as_of = date(2024, 12, 31)
+    return {
+        "trial_balance": lambda db: reports.get_trial_balance(company_id, None, as_of, db=db, current_user=None),
+        "balance_sheet": lambda db: reports.get_balance_sheet(company_id, None, as_of, db=db, current_user=None),
+        "income_statement": lambda db: reports.get_income_statement(
+            company_id, None, date(2024, 1, 1), as_of, db=db, current_user=None),
+        "journal_by_account": lambda db: journal.read_journal_entries(
+            company_id, account_id=account_id, limit=50, db=db, current_user=None),
+    }
+
+def time_all(runs, repeat):
+    results = {}
+    for name, run in runs.items():
+        samples = []
+        for _ in range(repeat):
+            db = SessionLocal()
+            report_cache_backend.clear()
+            try:
+                started = time.perf_counter()
+                run(db)
+                samples.append((time.perf_counter() - started) * 1000)
+            finally:
+                db.close()
+        results[name] = statistics.median(samples)
+    return results
+
+def set_indexes(present):
+    indexes = [
+        index
+        for table in Base.metadata.tables.values()
+        for index in table.indexes
+        if index.name in HOT_PATH_INDEXES
+    ]
+    for index in indexes:
+        if present:
+            index.create(engine, checkfirst=True)
+        else:
+            index.drop(engine, checkfirst=True)
+    if engine.dialect.name in ("sqlite", "postgresql"):
+        with engine.begin() as connection:
+            connection.execute(text("ANALYZE"))
+
+def main():
+    upgrade_database()
+    db = SessionLocal()
+    try:
+        company_id, account_id = seed(db, args.accounts, args.entries)
+    finally:
+        db.close()
+
+    runs = scenarios(company_id, account_id)
+    set_indexes(False)
+    before = time_all(runs, args.repeat)
+    set_indexes(True)
+    after = time_all(runs, args.repeat)
+
+    print(f"{args.entries} entries, {args.accounts} accounts on {engine.dialect.name} (median of {args.repeat}, ms)")
+    print(f"{'report':<20}{'before':>10}{'after':>10}")
+    for name in runs:
+        print(f"{name:<20}{before[name]:>10.1f}{after[name]:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -4,36 +4,38 @@ import api from '../services/api'
 import { Company } from '../types'
 import { format } from 'date-fns'
 
+// Amounts arrive as exact decimal strings, e.g. "1234.50"
+
 interface BalanceSheet {
   company: string
   as_of_date: string
   assets: {
-    accounts: Array<{ code: string; name: string; balance: number }>
-    total: number
+    accounts: Array<{ code: string; name: string; balance: string }>
+    total: string
   }
   liabilities: {
-    accounts: Array<{ code: string; name: string; balance: number }>
-    total: number
+    accounts: Array<{ code: string; name: string; balance: string }>
+    total: string
   }
   equity: {
-    accounts: Array<{ code: string; name: string; balance: number }>
-    total: number
+    accounts: Array<{ code: string; name: string; balance: string }>
+    total: string
   }
-  total_liabilities_and_equity: number
+  total_liabilities_and_equity: string
 }
 
 interface IncomeStatement {
   company: string
   period: string
   revenue: {
-    accounts: Array<{ code: string; name: string; balance: number }>
-    total: number
+    accounts: Array<{ code: string; name: string; balance: string }>
+    total: string
   }
   expenses: {
-    accounts: Array<{ code: string; name: string; balance: number }>
-    total: number
+    accounts: Array<{ code: string; name: string; balance: string }>
+    total: string
   }
-  net_income: number
+  net_income: string
 }
 
 interface TrialBalance {
@@ -43,11 +45,11 @@ interface TrialBalance {
     code: string
     name: string
     type: string
-    debit: number
-    credit: number
+    debit: string
+    credit: string
   }>
-  total_debit: number
-  total_credit: number
+  total_debit: string
+  total_credit: string
 }
 
 export default function Reports() {
@@ -64,11 +66,11 @@ export default function Reports() {
     }
   })
 
-  const formatCurrency = (amount: number) => {
+  const formatCurrency = (amount: string | number) => {
     return new Intl.NumberFormat('en-US', {
       style: 'currency',
       currency: 'USD'
-    }).format(amount)
+    }).format(Number(amount))
   }
 
   const generateReport = async () => {
@@ -301,8 +303,8 @@ export default function Reports() {
               data.accounts.map((account, idx) => (
                 <tr key={idx}>
                   <td className="px-2 py-2 text-sm">{account.code} - {account.name}</td>
-                  <td className="px-2 py-2 text-sm text-right">{account.debit > 0 ? formatCurrency(account.debit) : ''}</td>
-                  <td className="px-2 py-2 text-sm text-right">{account.credit > 0 ? formatCurrency(account.credit) : ''}</td>
+                  <td className="px-2 py-2 text-sm text-right">{Number(account.debit) > 0 ? formatCurrency(account.debit) : ''}</td>
+                  <td className="px-2 py-2 text-sm text-right">{Number(account.credit) > 0 ? formatCurrency(account.credit) : ''}</td>
                 </tr>
               ))
             ) : (